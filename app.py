@@ -1,9 +1,9 @@
 import streamlit as st
 import pandas as pd
-from src.data_loader import load_data
-from src.eda_visualization import show_eda_dashboard
-from src.ml_model import show_ml_section
-from src.regression_analysis import show_regression_analysis
+from src.data_loader import DATA_PATH, load_data
+from src import instrumentation
+from src.prewarm import start_prewarm
+# Các trang (và sklearn, statsmodels, plotly...) chỉ được import khi được chọn trong menu
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -23,6 +23,10 @@ menu = st.sidebar.radio("📍 Chọn nội dung:",
         "Insight & Recommendation"
     ]
 )
+show_perf = st.sidebar.toggle("⏱️ Performance", value=instrumentation.ENABLED,
+                              help="Đo thời gian, CPU và bộ nhớ của từng phần trên trang")
+instrumentation.start_run(f"page.{menu}", show_perf)
+start_prewarm()
 
 # --- MAIN CONTENT ---
 if menu == "Dataset Overview":
@@ -35,17 +39,20 @@ if menu == "Dataset Overview":
     - Age, Gender, Daily_Screen_Time, Sleep_Quality, Stress_Level, Days_Without_Social_Media, Exercise_Frequency, Platform, Happiness_Index
     """)
     
-    df = load_data("data/Mental_Health_and_Social_Media_Balance_Dataset.csv")
+    df = load_data(DATA_PATH)
     st.dataframe(df.head())
     st.write(f"📦 Tổng số dòng: {df.shape[0]}, Cột: {df.shape[1]}")
 
 elif menu == "EDA Dashboard":
+    from src.eda_visualization import show_eda_dashboard
     show_eda_dashboard()
 
 elif menu == "Regression Analysis":
+    from src.regression_analysis import show_regression_analysis
     show_regression_analysis()
 
 elif menu == "Machine Learning":
+    from src.ml_model import show_ml_section
     show_ml_section()
 elif menu == "Insight & Recommendation":
     st.title("📄 Tổng kết & Khuyến nghị")
@@ -80,3 +87,7 @@ elif menu == "Insight & Recommendation":
     Cân bằng các yếu tố này giúp nâng cao **sức khỏe tinh thần** và **chất lượng cuộc sống**.
     """)
 
+# --- Panel hiệu năng (span của cả lượt chạy, ghi ra file JSONL/Prometheus) ---
+records = instrumentation.end_run()
+if show_perf:
+    instrumentation.show_performance_panel(records)
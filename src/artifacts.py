@@ -0,0 +1,276 @@
+"""Dựng sẵn bundle artifact của dashboard (bảng, biểu đồ, mô hình) cho một phiên bản dữ liệu.
+
+Ví dụ::
+
+    python -m src.artifacts data/Mental_Health_and_Social_Media_Balance_Dataset.csv --workers 4
+
+Bundle nằm trong ``.cache/artifacts/<phiên bản dữ liệu>/``: bảng lưu Parquet, biểu đồ plotly
+lưu JSON, mô hình và các đối tượng khác lưu pickle, kèm ``manifest.json``. Các trang lấy
+artifact qua ``fetch``; artifact không có trong bundle (bộ lọc chưa dựng sẵn, tham số khác...)
+được tính trực tiếp như khi chưa có bundle.
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from src.data_loader import CACHE_DIR, DATA_PATH, dataset_version
+
+BUNDLE_DIR = os.environ.get("DASHBOARD_ARTIFACT_DIR", os.path.join(CACHE_DIR, "artifacts"))
+# Tăng khi đổi cách lưu hoặc nội dung artifact -> bundle cũ bị bỏ qua
+BUNDLE_FORMAT = 1
+MANIFEST = "manifest.json"
+# Mỗi module trang cung cấp ``precompute_tasks(path, age_ranges)`` -> [(hàm, tham số)]
+PAGE_MODULES = ["src.eda_visualization", "src.ml_model", "src.regression_analysis"]
+# Khoảng tuổi dựng sẵn cho bộ lọc EDA (mặc định của slider), nhân với mọi nền tảng
+DEFAULT_AGE_RANGES = [(20, 40)]
+
+# Lỗi khi đọc một artifact: file hỏng/thiếu, pickle của phiên bản thư viện khác...
+READ_ERRORS = (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError)
+
+# Bundle đã mở, dùng chung cho mọi session: (phiên bản, mtime manifest) -> Bundle
+_bundles = {}
+_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+def bundle_path(version):
+    return os.path.join(BUNDLE_DIR, version)
+
+
+def _file_name(name, suffix):
+    # Tên artifact có thể chứa ký tự đặc biệt (tên nền tảng...) -> tên file là hash
+    return hashlib.sha1(name.encode()).hexdigest()[:16] + suffix
+
+
+def _is_figure(obj):
+    # Kiểm tra theo module để không phải import plotly
+    return type(obj).__module__.startswith("plotly.graph_objs")
+
+
+def write_artifact(directory, name, obj):
+    """Ghi ``obj`` vào thư mục bundle, trả về các mục manifest ``{tên: mô tả}``.
+
+    dict/list/tuple được tách thành từng phần tử (``name/key``); DataFrame/Series lưu
+    Parquet, biểu đồ plotly lưu JSON, còn lại (mô hình, mảng, số...) lưu pickle.
+    """
+    if isinstance(obj, dict):
+        entries = {name: {"format": "dict", "keys": list(obj)}}
+        for key, value in obj.items():
+            entries.update(write_artifact(directory, f"{name}/{key}", value))
+        return entries
+    if isinstance(obj, (list, tuple)):
+        entries = {name: {"format": "list", "length": len(obj)}}
+        for i, value in enumerate(obj):
+            entries.update(write_artifact(directory, f"{name}/{i}", value))
+        return entries
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        file = _file_name(name, ".parquet")
+        try:
+            (obj.to_frame() if isinstance(obj, pd.Series) else obj).to_parquet(os.path.join(directory, file))
+            return {name: {"format": "series" if isinstance(obj, pd.Series) else "table", "file": file}}
+        except (ImportError, TypeError, ValueError):
+            # Tên cột không phải chuỗi, kiểu Parquet không hỗ trợ... -> pickle
+            pass
+    if _is_figure(obj):
+        file = _file_name(name, ".json")
+        with open(os.path.join(directory, file), "w") as f:
+            f.write(obj.to_json())
+        return {name: {"format": "figure", "file": file}}
+    file = _file_name(name, ".pkl")
+    with open(os.path.join(directory, file), "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {name: {"format": "pickle", "file": file}}
+
+
+class Bundle:
+    """Bundle đã dựng của một phiên bản dữ liệu; artifact chỉ được đọc khi cần lần đầu."""
+
+    def __init__(self, directory, manifest):
+        self.directory = directory
+        self.manifest = manifest
+        self.entries = manifest["artifacts"]
+        self._loaded = {}
+        self._bad = set()
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.entries and name not in self._bad
+
+    def mark_bad(self, name, error):
+        """Bỏ qua artifact ``name`` từ nay (đọc lỗi), chỉ ghi log lần đầu."""
+        with self._lock:
+            if name in self._bad:
+                return
+            self._bad.add(name)
+        logger.warning("Không đọc được artifact %r trong %s, tính trực tiếp: %r", name, self.directory, error)
+
+    def _read(self, entry):
+        path = os.path.join(self.directory, entry["file"])
+        if entry["format"] == "table":
+            return pd.read_parquet(path)
+        if entry["format"] == "series":
+            return pd.read_parquet(path).iloc[:, 0]
+        if entry["format"] == "figure":
+            with open(path) as f:
+                return f.read()
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def get(self, name):
+        entry = self.entries[name]
+        if entry["format"] == "dict":
+            return {key: self.get(f"{name}/{key}") for key in entry["keys"]}
+        if entry["format"] == "list":
+            return [self.get(f"{name}/{i}") for i in range(entry["length"])]
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded[name] = self._read(entry)
+            value = self._loaded[name]
+        if entry["format"] == "figure":
+            # Figure có thể bị sửa khi hiển thị -> mỗi lần lấy dựng một bản mới (như st.cache_data)
+            import plotly.io as pio
+
+            return pio.from_json(value)
+        # Bảng và mô hình dùng chung giữa các session (như st.cache_resource), chỉ đọc
+        return value
+
+
+def load_bundle(version):
+    """Bundle của ``version``, ``None`` nếu chưa dựng hoặc khác định dạng.
+
+    Manifest được đọc lại khi file thay đổi, nên bundle dựng lại trong lúc server
+    đang chạy được dùng ngay ở lượt chạy tiếp theo.
+    """
+    path = os.path.join(bundle_path(version), MANIFEST)
+    try:
+        key = (version, os.stat(path).st_mtime_ns)
+    except OSError:
+        return None
+    with _lock:
+        if key in _bundles:
+            return _bundles[key]
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    bundle = Bundle(bundle_path(version), manifest) if manifest.get("format") == BUNDLE_FORMAT else None
+    with _lock:
+        for old_key in [k for k in _bundles if k[0] == version]:
+            del _bundles[old_key]
+        _bundles[key] = bundle
+    return bundle
+
+
+def fetch(version, name, compute):
+    """Artifact ``name`` từ bundle của ``version``; không có thì ``compute()`` (tính trực tiếp)."""
+    bundle = load_bundle(version)
+    if bundle is not None and name in bundle:
+        try:
+            return bundle.get(name)
+        except READ_ERRORS as error:
+            # Không thử đọc lại ở các lượt chạy sau: lần nào cũng lỗi và tốn thêm thời gian
+            bundle.mark_bad(name, error)
+    return compute()
+
+
+def _quiet_streamlit():
+    # Hàm của các trang dùng st.cache_*; ngoài server Streamlit chúng chạy với cache trong
+    # bộ nhớ và in cảnh báo "No runtime found" cho mỗi hàm -> chỉ giữ log lỗi
+    from streamlit.logger import set_log_level
+
+    set_log_level("error")
+
+
+def _run_task(directory, fn, args):
+    start = time.perf_counter()
+    entries = {}
+    for name, obj in fn(*args).items():
+        entries.update(write_artifact(directory, name, obj))
+    return entries, time.perf_counter() - start
+
+
+def build_bundle(path=DATA_PATH, age_ranges=None, workers=None, modules=None):
+    """Dựng bundle cho phiên bản hiện tại của ``path``, các job chạy song song trên process pool.
+
+    Bundle được ghi vào thư mục tạm rồi đổi tên, nên server đang chạy không bao giờ đọc
+    phải bundle dở dang. Trả về (thư mục bundle, manifest).
+    """
+    start = time.perf_counter()
+    _quiet_streamlit()
+    version = dataset_version(path)
+    age_ranges = [tuple(r) for r in (age_ranges or DEFAULT_AGE_RANGES)]
+    tasks = []
+    for module in modules or PAGE_MODULES:
+        tasks += importlib.import_module(module).precompute_tasks(path, age_ranges)
+
+    directory = bundle_path(version)
+    staging = f"{directory}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    entries, timings = {}, {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_streamlit) as pool:
+            futures = {pool.submit(_run_task, staging, fn, args): f"{fn.__name__}{args[1:]}" for fn, args in tasks}
+            for future in as_completed(futures):
+                task_entries, seconds = future.result()
+                entries.update(task_entries)
+                timings[futures[future]] = seconds
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "version": version,
+            "source": os.path.abspath(path),
+            "created": time.time(),
+            "seconds": time.perf_counter() - start,
+            "age_ranges": age_ranges,
+            "tasks": timings,
+            "artifacts": entries,
+        }
+        with open(os.path.join(staging, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=1, ensure_ascii=False)
+
+        old = f"{directory}.{os.getpid()}.old"
+        if os.path.exists(directory):
+            os.replace(directory, old)
+        os.replace(staging, directory)
+        shutil.rmtree(old, ignore_errors=True)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return directory, manifest
+
+
+def _age_ranges(value):
+    ranges = []
+    for item in value.split(","):
+        low, high = item.split("-")
+        ranges.append((int(low), int(high)))
+    return ranges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dựng sẵn bảng, biểu đồ và mô hình của dashboard.")
+    parser.add_argument("input", nargs="?", default=DATA_PATH, help="Dataset (mặc định DASHBOARD_DATA_PATH)")
+    parser.add_argument("--age-ranges", type=_age_ranges, default=DEFAULT_AGE_RANGES,
+                        help="Các khoảng tuổi dựng sẵn cho bộ lọc EDA, ví dụ 20-40,18-25 (mặc định 20-40)")
+    parser.add_argument("--workers", type=int, default=0, help="Số tiến trình (mặc định: số core)")
+    args = parser.parse_args(argv)
+
+    directory, manifest = build_bundle(args.input, args.age_ranges, args.workers or None)
+    print(f"Đã dựng {len(manifest['artifacts']):,} artifact từ {len(manifest['tasks'])} job "
+          f"trong {manifest['seconds']:.1f}s -> {directory}")
+    for task, seconds in sorted(manifest["tasks"].items(), key=lambda item: -item[1]):
+        print(f"  {seconds:8.2f}s  {task}")
+
+
+if __name__ == "__main__":
+    main()
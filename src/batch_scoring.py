@@ -0,0 +1,148 @@
+"""Chấm điểm Happiness hàng loạt, không cần Streamlit.
+
+Ví dụ::
+
+    python -m src.batch_scoring users.csv predictions.parquet --model "Random Forest" --workers 8
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pandas as pd
+
+from src.forest_inference import CompiledForest
+from src.model_registry import FEATURE_COLUMNS, MODEL_FACTORIES, get_default_pipeline, happiness_band
+from src.streaming_stats import DEFAULT_CHUNKSIZE, read_chunks
+
+ID_COLUMN = "User_ID"
+
+# Pipeline dùng trong tiến trình worker (gán bởi _init_worker)
+_worker_pipeline = None
+
+
+def score_chunk(pipeline, chunk):
+    # Pipeline huấn luyện với DataFrame nhớ tên cột đầu vào (có thể gồm đặc trưng dẫn xuất)
+    predictions = pipeline.predict(chunk[list(getattr(pipeline, "feature_names_in_", FEATURE_COLUMNS))])
+    return pd.DataFrame({
+        ID_COLUMN: chunk[ID_COLUMN].to_numpy() if ID_COLUMN in chunk else chunk.index.to_numpy(),
+        "Predicted_Happiness": predictions,
+        "Band": happiness_band(predictions),
+    })
+
+
+def _single_threaded(pipeline):
+    """Đặt ``n_jobs=1`` cho các bước có tham số này (vd. RandomForest ``n_jobs=-1``)."""
+    get_params = getattr(pipeline, "get_params", None)
+    if get_params is None:
+        # CompiledForest: vốn chạy đơn luồng
+        return pipeline
+    params = {name: 1 for name in get_params() if name == "n_jobs" or name.endswith("__n_jobs")}
+    if params:
+        pipeline.set_params(**params)
+    return pipeline
+
+
+def _init_worker(pipeline):
+    global _worker_pipeline
+    # Mỗi worker đã chiếm một lõi; predict đa luồng trong từng worker sẽ tranh CPU lẫn nhau
+    _worker_pipeline = _single_threaded(pipeline)
+
+
+def _score_in_worker(chunk):
+    return score_chunk(_worker_pipeline, chunk)
+
+
+def _scored_chunks(pipeline, chunks, workers):
+    if workers <= 1:
+        for chunk in chunks:
+            yield score_chunk(pipeline, chunk)
+        return
+
+    # Giữ tối đa 2 khối/worker đang xử lý để bộ nhớ không tăng theo kích thước file
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pipeline,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_in_worker, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class _Writer:
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._header = True
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_file(input_path, output_path, model_type="Random Forest", pipeline=None,
+               chunksize=DEFAULT_CHUNKSIZE, workers=1):
+    """Đọc ``input_path`` theo khối, dự đoán Happiness và ghi ra ``output_path`` (CSV/Parquet).
+
+    Mặc định dùng pipeline đã huấn luyện trong model registry (giống trang Machine Learning),
+    dự đoán bằng ``predict`` của sklearn (song song, nhanh hơn forest đã biên dịch với khối
+    lớn); ``pipeline`` cũng có thể là ``CompiledForest`` nạp từ file .npz đã xuất.
+    Trả về dict gồm số dòng, thời gian chạy và tốc độ (dòng/giây).
+    """
+    if pipeline is None:
+        pipeline = get_default_pipeline(model_type)
+
+    start = time.perf_counter()
+    rows = 0
+    writer = _Writer(output_path)
+    try:
+        for scored in _scored_chunks(pipeline, read_chunks(input_path, chunksize), workers):
+            writer.write(scored)
+            rows += len(scored)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed if elapsed else float("inf")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dự đoán Happiness hàng loạt từ file CSV/Parquet.")
+    parser.add_argument("input", help="File đầu vào (.csv hoặc .parquet) theo schema của dataset")
+    parser.add_argument("output", help="File kết quả (.csv hoặc .parquet)")
+    parser.add_argument("--model", default="Random Forest", choices=list(MODEL_FACTORIES),
+                        help="Loại mô hình lấy từ model registry")
+    parser.add_argument("--model-file", help="Dùng pipeline joblib (hoặc forest .npz đã xuất) thay vì model registry")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Số tiến trình dự đoán song song")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        args.workers = os.cpu_count() or 1
+    if args.model_file and args.model_file.endswith(".npz"):
+        pipeline = CompiledForest.load(args.model_file)
+    else:
+        pipeline = joblib.load(args.model_file) if args.model_file else None
+    stats = score_file(args.input, args.output, args.model, pipeline, args.chunksize, args.workers)
+    print(f"Đã chấm {stats['rows']:,} dòng trong {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} dòng/giây) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from src.covariance_engine import CovarianceCube
+from src.data_loader import CACHE_DIR, clear_cache, load_data
+from src.filter_index import FilterIndex
+from src.forest_inference import CompiledForest
+from src.model_registry import build_pipeline, training_split
+from src.ols_engine import GroupedOLSAccumulator, OLSAccumulator
+from src.regression_analysis import GROUP_COLUMNS, X_COL, Y_COL
+from src.segmentation import UserSegmentation
+from src.streaming_stats import CORR_COLUMNS, compute_eda_tables, read_chunks
+from src.synthetic_data import synthetic_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+SYNTHETIC_DIR = os.path.join(CACHE_DIR, "synthetic")
+RESULTS_DIR = os.path.join(CACHE_DIR, "benchmarks")
+
+DEFAULT_SIZES = "1e3,1e4,1e5"
+# Bộ lọc dùng cho các case EDA (giống giá trị mặc định của sidebar)
+AGE_RANGE = (20, 40)
+# Trang -> khóa session_state của thanh tab (None: trang không có tab)
+PAGES = {
+    "EDA Dashboard": "eda_section",
+    "Machine Learning": "ml_section",
+    "Regression Analysis": None,
+}
+PACKAGES = ["streamlit", "pandas", "numpy", "scikit-learn", "pyarrow", "plotly"]
+# Chậm hơn ngưỡng này so với lần chạy gốc thì coi là regression
+REGRESSION_RATIO = 1.2
+# Số lần gọi predict một dòng khi đo độ trễ p50/p99 (subcommand inference)
+INFERENCE_CALLS = 1000
+
+# Ngân sách cold start (giây): import streamlit + app và lượt render đầu tiên trong tiến trình mới
+STARTUP_BUDGET = float(os.environ.get("DASHBOARD_STARTUP_BUDGET", 2.0))
+# Không được nạp trước khi người dùng mở trang cần chúng (plotly do chính streamlit import)
+HEAVY_MODULES = ["sklearn", "statsmodels", "scipy", "joblib", "matplotlib", "seaborn"]
+# Chạy bằng "python -c" để tiến trình con không import chính module benchmark (vốn kéo theo sklearn)
+_STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+seconds = time.perf_counter() - start
+loaded = sorted({name.split(".")[0] for name in sys.modules} & set(sys.argv[2].split(",")))
+print(json.dumps({"seconds": seconds, "heavy": loaded, "errors": [e.value for e in at.exception]}))
+"""
+
+CASES = {}
+
+
+def case(name):
+    """Đăng ký một case benchmark ``fn(ctx)``; ``ctx`` chứa path, df và các đối tượng dùng chung."""
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+# --- Nạp dữ liệu ---
+@case("load_data_csv")
+def _load_csv(ctx):
+    clear_cache(ctx["path"])
+    load_data(ctx["path"])
+
+
+@case("load_data_snapshot")
+def _load_snapshot(ctx):
+    clear_cache()
+    load_data(ctx["path"])
+
+
+@case("load_data_cached")
+def _load_cached(ctx):
+    load_data(ctx["path"])
+
+
+# --- EDA ---
+@case("eda_filter_index")
+def _filter_index(ctx):
+    ctx["index"] = FilterIndex(ctx["df"])
+
+
+@case("eda_filter_describe")
+def _filter_describe(ctx):
+    index = ctx.get("index") or FilterIndex(ctx["df"])
+    platform = index.platforms[0]
+    index.slice(platform, AGE_RANGE)
+    index.summary(platform, AGE_RANGE)
+    index.gender_counts(platform, AGE_RANGE)
+
+
+@case("eda_streaming_tables")
+def _streaming_tables(ctx):
+    platform = ctx["df"]["Social_Media_Platform"].iloc[0]
+    compute_eda_tables(read_chunks(ctx["path"]), AGE_RANGE, platform)
+
+
+@case("correlation_cube")
+def _correlation_cube(ctx):
+    ctx["cube"] = CovarianceCube().update(ctx["df"])
+
+
+@case("correlation_filtered")
+def _correlation_filtered(ctx):
+    cube = ctx.get("cube") or CovarianceCube().update(ctx["df"])
+    cube.corr(CORR_COLUMNS, platform=ctx["df"]["Social_Media_Platform"].iloc[0], age_range=AGE_RANGE)
+
+
+# --- Mô hình ---
+@case("kmeans")
+def _kmeans(ctx):
+    UserSegmentation(n_clusters=3).fit(ctx["df"])
+
+
+@case("fit_linear_regression")
+def _fit_linear(ctx):
+    X_train, _, y_train, _ = ctx["split"]
+    build_pipeline("Linear Regression").fit(X_train, y_train)
+
+
+@case("fit_random_forest")
+def _fit_forest(ctx):
+    X_train, _, y_train, _ = ctx["split"]
+    ctx["forest"] = build_pipeline("Random Forest", n_jobs=-1).fit(X_train, y_train)
+
+
+def _forest(ctx):
+    if "forest" not in ctx:
+        _fit_forest(ctx)
+    return ctx["forest"]
+
+
+@case("predict_forest_sklearn")
+def _predict_forest_sklearn(ctx):
+    _forest(ctx).predict(ctx["split"][1])
+
+
+@case("predict_forest_compiled")
+def _predict_forest_compiled(ctx):
+    # Gồm cả bước xuất mảng nút, như lần dự đoán đầu tiên sau khi registry nạp pipeline
+    CompiledForest.from_pipeline(_forest(ctx)).predict(ctx["split"][1])
+
+
+@case("ols_grouped")
+def _ols(ctx):
+    OLSAccumulator([X_COL], Y_COL).update(ctx["df"]).fit()
+    grouped = [GroupedOLSAccumulator([X_COL], Y_COL, by).update(ctx["df"]) for by in GROUP_COLUMNS]
+    for acc in grouped:
+        acc.fit()
+
+
+def _time(fn, ctx, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(ctx)
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def _selected(names, only, skip):
+    return [
+        name for name in names
+        if (not only or any(name.startswith(p) for p in only)) and not any(name.startswith(p) for p in skip)
+    ]
+
+
+def run_cases(path, n_rows, repeat=3, only=(), skip=()):
+    """Chạy các case trong tiến trình hiện tại trên file ``path``."""
+    ctx = {"path": path}
+    results = []
+    for name in _selected(CASES, only, skip):
+        if "df" not in ctx and not name.startswith("load_data"):
+            ctx["df"] = load_data(path)
+            ctx["split"] = training_split(ctx["df"])
+        runs = _time(CASES[name], ctx, repeat)
+        results.append(_record(name, n_rows, runs))
+        print(f"  {name:<28} {min(runs):>10.4f}s")
+    return results
+
+
+def _record(name, n_rows, runs):
+    return {"case": name, "rows": n_rows, "best": min(runs), "mean": float(np.mean(runs)), "runs": runs}
+
+
+def render_pages(timeout=600, only=(), skip=()):
+    """Render headless từng trang bằng AppTest: lần đầu (cache lạnh), rerun, rồi mở lần lượt từng tab.
+
+    Dữ liệu lấy từ ``DASHBOARD_DATA_PATH`` như khi chạy app thật.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    for page, tab_key in PAGES.items():
+        slug = page.split()[0].lower()
+        if not _selected([f"page_{slug}_cold", f"page_{slug}_rerun", f"page_{slug}_tabs"], only, skip):
+            continue
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        at.run()
+        start = time.perf_counter()
+        at.sidebar.radio[0].set_value(page).run()
+        timings[f"page_{slug}_cold"] = time.perf_counter() - start
+        _raise_on_exception(at, page)
+
+        start = time.perf_counter()
+        at.run()
+        timings[f"page_{slug}_rerun"] = time.perf_counter() - start
+
+        if tab_key is not None:
+            start = time.perf_counter()
+            for label in [tab.label for tab in at.tabs]:
+                at.session_state[tab_key] = label
+                at.run()
+                _raise_on_exception(at, f"{page} / {label}")
+            timings[f"page_{slug}_tabs"] = time.perf_counter() - start
+    return {name: seconds for name, seconds in timings.items() if name in _selected(timings, only, skip)}
+
+
+def _raise_on_exception(at, where):
+    if len(at.exception):
+        raise RuntimeError(f"{where}: {at.exception[0].value}")
+
+
+def run_pages(path, n_rows, timeout=600, only=(), skip=()):
+    """Render các trang trong tiến trình con: đường dẫn dữ liệu và thư mục cache mới được truyền
+    qua biến môi trường, nên lần render đầu thực sự bắt đầu với cache lạnh."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "pages.json")
+        env = dict(os.environ, DASHBOARD_DATA_PATH=os.path.abspath(path),
+                   DASHBOARD_CACHE_DIR=os.path.join(tmp, "cache"))
+        cmd = [sys.executable, "-m", "src.benchmark", "pages", out_path, "--timeout", str(timeout)]
+        cmd += [f"--only={p}" for p in only] + [f"--skip={p}" for p in skip]
+        proc = subprocess.run(cmd, env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode:
+            raise RuntimeError(f"Render trang thất bại:\n{proc.stderr[-2000:]}")
+        with open(out_path) as f:
+            timings = json.load(f)
+
+    results = []
+    for name, seconds in timings.items():
+        results.append(_record(name, n_rows, [seconds]))
+        print(f"  {name:<28} {seconds:>10.4f}s")
+    return results
+
+
+def measure_startup(repeat=5):
+    """Thời gian cold start của app (mỗi lần một tiến trình Python mới) và các module nặng bị nạp sớm."""
+    runs, heavy = [], set()
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT, APP_PATH, ",".join(HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            raise RuntimeError(f"Khởi động app thất bại:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if result["errors"]:
+            raise RuntimeError(f"App lỗi khi khởi động: {result['errors'][0]}")
+        runs.append(result["seconds"])
+        heavy.update(result["heavy"])
+    return {"median": float(np.median(runs)), "runs": runs, "heavy": sorted(heavy)}
+
+
+def check_startup(repeat=5, budget=STARTUP_BUDGET):
+    """In kết quả và trả về danh sách vi phạm (vượt ngân sách, import module nặng quá sớm)."""
+    result = measure_startup(repeat)
+    print(f"Cold start: median {result['median']:.3f}s "
+          f"({', '.join(f'{s:.3f}' for s in result['runs'])}), ngân sách {budget:.2f}s")
+    problems = []
+    if result["median"] > budget:
+        problems.append(f"cold start {result['median']:.3f}s vượt ngân sách {budget:.2f}s")
+    if result["heavy"]:
+        problems.append(f"module nặng bị import khi khởi động: {', '.join(result['heavy'])}")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return problems
+
+
+def _latencies(predict, rows, calls):
+    seconds = []
+    for i in range(calls):
+        row = rows.iloc[[i % len(rows)]]
+        start = time.perf_counter()
+        predict(row)
+        seconds.append(time.perf_counter() - start)
+    return np.array(seconds)
+
+
+def measure_inference(pipeline, X, calls=INFERENCE_CALLS, repeat=3):
+    """So sánh ``pipeline.predict`` (sklearn) với forest đã biên dịch trên ``X``.
+
+    Kiểm tra hai bên cho kết quả giống hệt nhau, rồi đo độ trễ một dòng (p50/p99 qua
+    ``calls`` lần gọi) và throughput dự đoán cả lô (dòng/giây, tốt nhất trong ``repeat`` lần).
+    """
+    start = time.perf_counter()
+    compiled = CompiledForest.from_pipeline(pipeline)
+    export_seconds = time.perf_counter() - start
+    if not np.array_equal(pipeline.predict(X), compiled.predict(X)):
+        raise AssertionError("Forest đã biên dịch cho kết quả khác sklearn")
+
+    results = {"export_seconds": export_seconds, "rows": len(X)}
+    for name, predict in (("sklearn", pipeline.predict), ("compiled", compiled.predict)):
+        latencies = _latencies(predict, X, calls)
+        batch = min(_time(lambda _: predict(X), None, repeat))
+        results[name] = {
+            "p50_ms": float(np.percentile(latencies, 50) * 1e3),
+            "p99_ms": float(np.percentile(latencies, 99) * 1e3),
+            "rows_per_sec": len(X) / batch,
+        }
+    return results
+
+
+def run_inference(n_rows, calls=INFERENCE_CALLS, seed=42):
+    path = synthetic_csv(n_rows, SYNTHETIC_DIR, seed)
+    X_train, X_test, y_train, _ = training_split(load_data(path))
+    # Cùng cấu hình với model registry (n_jobs=-1)
+    pipeline = build_pipeline("Random Forest", n_jobs=-1).fit(X_train, y_train)
+    result = measure_inference(pipeline, X_test, calls)
+    print(f"Random Forest {pipeline.named_steps['model'].n_estimators} cây, {n_rows:,} dòng "
+          f"(lô dự đoán {result['rows']:,} dòng), xuất mảng nút {result['export_seconds']:.3f}s, "
+          f"kết quả giống hệt sklearn")
+    print(f"  {'':<10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'dòng/giây':>14}")
+    for name in ("sklearn", "compiled"):
+        r = result[name]
+        print(f"  {name:<10} {r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['rows_per_sec']:>14,.0f}")
+    return result
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _environment():
+    packages = {}
+    for name in PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
+
+
+def run(sizes, repeat=3, seed=42, pages=True, timeout=600, only=(), skip=(), output=None):
+    commit = _git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    results = []
+    for n_rows in sizes:
+        print(f"== {n_rows:,} dòng")
+        path = synthetic_csv(n_rows, SYNTHETIC_DIR, seed)
+        results += run_cases(path, n_rows, repeat, only, skip)
+        if pages:
+            results += run_pages(path, n_rows, timeout, only, skip)
+
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seed": seed,
+        "repeat": repeat,
+        "environment": _environment(),
+        "results": results,
+    }
+    output = output or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Đã lưu kết quả vào {output}")
+    return report
+
+
+def _resolve(ref):
+    """File kết quả từ đường dẫn hoặc (tiền tố) commit."""
+    if os.path.exists(ref):
+        return ref
+    names = sorted(n for n in os.listdir(RESULTS_DIR) if n.startswith(ref)) if os.path.isdir(RESULTS_DIR) else []
+    if not names:
+        raise SystemExit(f"Không tìm thấy kết quả benchmark cho '{ref}' trong {RESULTS_DIR}")
+    return os.path.join(RESULTS_DIR, names[0])
+
+
+def _results_frame(ref):
+    with open(_resolve(ref)) as f:
+        report = json.load(f)
+    return pd.DataFrame(report["results"]).set_index(["case", "rows"])["best"], report["commit"]
+
+
+def compare(base, head, threshold=REGRESSION_RATIO):
+    """Bảng so sánh thời gian (best) giữa hai lần chạy; trả về các dòng bị chậm hơn ngưỡng."""
+    base_times, base_commit = _results_frame(base)
+    head_times, head_commit = _results_frame(head)
+    table = pd.concat({"base": base_times, "head": head_times}, axis=1, join="inner")
+    table["ratio"] = table["head"] / table["base"]
+    table["status"] = np.select(
+        [table["ratio"] > threshold, table["ratio"] < 1 / threshold], ["slower", "faster"], ""
+    )
+    print(f"base = {base_commit}, head = {head_commit} (giây, best of repeat)")
+    with pd.option_context("display.max_rows", None, "display.width", 120):
+        print(table.round(4))
+    return table[table["status"] == "slower"]
+
+
+def _sizes(text):
+    return [int(float(s)) for s in text.split(",") if s]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark các luồng xử lý của dashboard trên dữ liệu giả lập.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Chạy benchmark và lưu kết quả theo commit")
+    run_parser.add_argument("--sizes", type=_sizes, default=_sizes(DEFAULT_SIZES),
+                            help=f"Danh sách số dòng, ví dụ 1e3,1e5,1e7 (mặc định {DEFAULT_SIZES})")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--no-pages", action="store_true", help="Bỏ qua render trang bằng AppTest")
+    run_parser.add_argument("--only", action="append", default=[], help="Chỉ chạy case có tiền tố này")
+    run_parser.add_argument("--skip", action="append", default=[], help="Bỏ qua case có tiền tố này")
+    run_parser.add_argument("--timeout", type=float, default=600, help="Timeout mỗi lần render trang (giây)")
+    run_parser.add_argument("--output", help="File JSON kết quả (mặc định .cache/benchmarks/<commit>.json)")
+
+    compare_parser = sub.add_parser("compare", help="So sánh hai lần chạy (commit hoặc file JSON)")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=REGRESSION_RATIO)
+
+    startup_parser = sub.add_parser("startup", help="Đo cold start của app, lỗi nếu vượt ngân sách")
+    startup_parser.add_argument("--repeat", type=int, default=5)
+    startup_parser.add_argument("--budget", type=float, default=STARTUP_BUDGET,
+                                help=f"Ngân sách (giây, mặc định {STARTUP_BUDGET} hoặc DASHBOARD_STARTUP_BUDGET)")
+
+    inference_parser = sub.add_parser("inference", help="So sánh predict của sklearn với forest đã biên dịch")
+    inference_parser.add_argument("--rows", type=lambda s: int(float(s)), default=100_000,
+                                  help="Số dòng dữ liệu giả lập (mặc định 1e5, 20%% dùng làm lô dự đoán)")
+    inference_parser.add_argument("--calls", type=int, default=INFERENCE_CALLS,
+                                  help="Số lần gọi predict một dòng khi đo độ trễ")
+    inference_parser.add_argument("--seed", type=int, default=42)
+
+    # Dùng nội bộ: render trang trong tiến trình con
+    pages_parser = sub.add_parser("pages")
+    pages_parser.add_argument("output")
+    pages_parser.add_argument("--timeout", type=float, default=600)
+    pages_parser.add_argument("--only", action="append", default=[])
+    pages_parser.add_argument("--skip", action="append", default=[])
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args.sizes, args.repeat, args.seed, not args.no_pages, args.timeout, args.only, args.skip, args.output)
+    elif args.command == "compare":
+        if len(compare(args.base, args.head, args.threshold)):
+            sys.exit(1)
+    elif args.command == "startup":
+        if check_startup(args.repeat, args.budget):
+            sys.exit(1)
+    elif args.command == "inference":
+        run_inference(args.rows, args.calls, args.seed)
+    else:
+        with open(args.output, "w") as f:
+            json.dump(render_pages(args.timeout, args.only, args.skip), f)
+
+
+if __name__ == "__main__":
+    main()
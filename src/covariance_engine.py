@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+GROUP_COLUMNS = ["Social_Media_Platform", "Gender", "Age"]
+
+
+class CovarianceCube:
+    """Ma trận hiệp phương sai của mọi cột số, lưu theo ô (nền tảng, giới tính, tuổi).
+
+    Mỗi ô giữ (n, mean, co-moment); các ô và các khối dữ liệu được gộp bằng công thức
+    Chan/Welford nên có thể dựng theo từng khối. Ma trận toàn bộ dữ liệu và ma trận của
+    bất kỳ bộ lọc nào (nền tảng, giới tính, khoảng tuổi) đều được gộp từ các ô, không
+    cần đọc lại dữ liệu gốc.
+
+    Dòng có NaN ở bất kỳ cột số nào bị loại khỏi mọi ô (loại theo dòng), khác với
+    ``DataFrame.corr`` vốn loại theo từng cặp cột: với dữ liệu thiếu giá trị, hệ số
+    tương quan có thể lệch so với pandas. Dataset gốc không có giá trị thiếu.
+    """
+
+    def __init__(self, columns=None, group_columns=None):
+        self.columns = list(columns) if columns is not None else None
+        self.group_columns = list(group_columns or GROUP_COLUMNS)
+        self.keys = pd.DataFrame(columns=self.group_columns)
+        self._positions = {}
+        self.n = np.zeros(0)
+        self.mean = None
+        self.comoment = None
+
+    def update(self, df):
+        if self.columns is None:
+            self.columns = list(df.select_dtypes("number").columns)
+        k = len(self.columns)
+        if self.mean is None:
+            self.mean = np.zeros((0, k))
+            self.comoment = np.zeros((0, k, k))
+
+        values = df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = ~np.isnan(values).any(axis=1)
+        if not ok.any():
+            return self
+        values = values[ok]
+        codes, uniques = pd.MultiIndex.from_frame(df.loc[ok, self.group_columns].astype(object)).factorize()
+        m = len(uniques)
+
+        # --- Thống kê từng ô trong khối (trừ trung bình ô trước khi nhân để ổn định số học) ---
+        n = np.bincount(codes, minlength=m).astype(np.float64)
+        sums = np.stack([np.bincount(codes, weights=values[:, j], minlength=m) for j in range(k)], axis=1)
+        mean = sums / n[:, None]
+        centered = values - mean[codes]
+        comoment = np.empty((m, k, k))
+        for i in range(k):
+            for j in range(i, k):
+                comoment[:, i, j] = comoment[:, j, i] = np.bincount(
+                    codes, weights=centered[:, i] * centered[:, j], minlength=m
+                )
+
+        self._absorb(list(uniques), n, mean, comoment)
+        return self
+
+    def _absorb(self, keys, n, mean, comoment):
+        # --- Gộp các ô mới vào các ô đã có (ô chưa có thì thêm vào cuối) ---
+        k = len(self.columns)
+        positions = np.array([self._positions.get(key, -1) for key in keys], dtype=np.int64)
+        new = positions < 0
+        if new.any():
+            start = len(self.n)
+            positions[new] = np.arange(start, start + new.sum())
+            new_keys = [key for key, is_new in zip(keys, new) if is_new]
+            for key, pos in zip(new_keys, positions[new]):
+                self._positions[key] = pos
+            self.keys = pd.concat([self.keys, pd.DataFrame(new_keys, columns=self.group_columns)], ignore_index=True)
+            self.n = np.concatenate([self.n, np.zeros(new.sum())])
+            self.mean = np.concatenate([self.mean, np.zeros((new.sum(), k))])
+            self.comoment = np.concatenate([self.comoment, np.zeros((new.sum(), k, k))])
+
+        self.n[positions], self.mean[positions], self.comoment[positions] = _merge_pairs(
+            self.n[positions], self.mean[positions], self.comoment[positions], n, mean, comoment
+        )
+
+    def _select(self, platform=None, gender=None, age_range=None):
+        mask = np.ones(len(self.n), dtype=bool)
+        if platform is not None:
+            mask &= (self.keys[self.group_columns[0]] == platform).to_numpy()
+        if gender is not None:
+            mask &= (self.keys[self.group_columns[1]] == gender).to_numpy()
+        if age_range is not None:
+            ages = self.keys[self.group_columns[2]].to_numpy(dtype=np.float64)
+            mask &= (ages >= age_range[0]) & (ages <= age_range[1])
+        return mask
+
+    def stats(self, platform=None, gender=None, age_range=None):
+        """(n, mean, co-moment) của tập dữ liệu thỏa bộ lọc.
+
+        Gộp từ các ô ở mỗi lần gọi (số ô nhỏ, rẻ) thay vì nhớ theo bộ lọc: cube dùng chung
+        cho mọi session qua ``st.cache_resource``, nên không giữ trạng thái thay đổi theo lượt xem.
+        """
+        mask = self._select(platform, gender, age_range)
+        return _merge_all(self.n[mask], self.mean[mask], self.comoment[mask])
+
+    def count(self, platform=None, gender=None, age_range=None):
+        return int(self.stats(platform, gender, age_range)[0])
+
+    def cov(self, columns=None, platform=None, gender=None, age_range=None):
+        n, _, comoment = self.stats(platform, gender, age_range)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = pd.DataFrame(comoment / (n - 1), index=self.columns, columns=self.columns)
+        return cov if columns is None else cov.loc[columns, columns]
+
+    def corr(self, columns=None, platform=None, gender=None, age_range=None):
+        return cov_to_corr(self.cov(columns, platform, gender, age_range))
+
+    def merge(self, other):
+        if other.mean is None:
+            return self
+        if self.mean is None:
+            self.columns = list(other.columns)
+            k = len(self.columns)
+            self.mean, self.comoment = np.zeros((0, k)), np.zeros((0, k, k))
+        keys = list(other.keys.itertuples(index=False, name=None))
+        self._absorb(keys, other.n, other.mean, other.comoment)
+        return self
+
+
+def _merge_pairs(n_a, mean_a, c_a, n_b, mean_b, c_b):
+    """Gộp từng cặp (n, mean, co-moment) theo công thức Chan et al."""
+    n = n_a + n_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w = np.where(n > 0, n_b / n, 0.0)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * w[:, None]
+    comoment = c_a + c_b + np.einsum("m,mi,mj->mij", n_a * w, delta, delta)
+    return n, mean, comoment
+
+
+def _merge_all(n, mean, comoment):
+    total = n.sum()
+    k = mean.shape[1]
+    if total == 0:
+        return 0.0, np.full(k, np.nan), np.zeros((k, k))
+    grand = (n[:, None] * mean).sum(axis=0) / total
+    delta = mean - grand
+    return total, grand, comoment.sum(axis=0) + np.einsum("m,mi,mj->ij", n, delta, delta)
+
+
+def cov_to_corr(cov):
+    std = np.sqrt(np.diag(cov.to_numpy()))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov.to_numpy() / np.outer(std, std)
+    return pd.DataFrame(corr, index=cov.index, columns=cov.columns)
+
@@ -1,7 +1,41 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
 import pandas as pd
 
-def load_data(path):
-    df = pd.read_csv(path)
+from src.derived_features import add_derived_features, definitions_hash
+
+DATA_PATH = os.environ.get("DASHBOARD_DATA_PATH", "data/Mental_Health_and_Social_Media_Balance_Dataset.csv")
+
+# --- Cấu hình cache ---
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", ".cache")
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+# Arrow IPC không nén để memory-map được (Parquet luôn phải giải mã vào heap)
+SNAPSHOT_SUFFIX = ".arrow"
+
+# --- Kiểu dữ liệu tối ưu cho từng cột ---
+CATEGORICAL_COLUMNS = ["Gender", "Social_Media_Platform"]
+SCORE_COLUMNS = ["Sleep_Quality1_10", "Stress_Level1_10", "Happiness_Index1_10"]
+COUNT_COLUMNS = ["Age", "Days_Without_Social_Media", "Exercise_Frequencyweek"]
+FLOAT_COLUMNS = ["Daily_Screen_Timehrs"]
+
+FINGERPRINTS_PATH = os.path.join(SNAPSHOT_DIR, "fingerprints.json")
+# Dấu vân tay mới -> dấu vân tay cũ khi file chỉ được nối thêm dòng ở cuối
+APPENDS_PATH = os.path.join(SNAPSHOT_DIR, "appends.json")
+MAX_APPENDS = 256
+
+# Cache trong tiến trình, dùng chung cho mọi session Streamlit
+_frames = {}
+_fingerprints = {}
+_appends = {}
+_lock = threading.Lock()
+
+
+def normalize_columns(df):
     df.columns = (
         df.columns.str.strip()
         .str.replace(" ", "_")
@@ -10,3 +44,277 @@ def load_data(path):
         .str.replace("-", "_")
     )
     return df
+
+
+def _smallest_int(values):
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if values.min() >= info.min and values.max() <= info.max:
+            return dtype
+    return np.int64
+
+
+def optimize_dtypes(df):
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    for col in SCORE_COLUMNS + COUNT_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        # Chỉ ép sang số nguyên khi cột không có NaN và toàn giá trị nguyên
+        if values.notna().all() and len(values) and (values == np.floor(values)).all():
+            df[col] = values.astype(_smallest_int(values))
+        else:
+            df[col] = values.astype(np.float32)
+
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float32)
+    return df
+
+
+def file_fingerprint(path):
+    """Băm nội dung file nguồn (SHA-1), dùng làm khóa cho snapshot."""
+    return _hash_file(path)[0]
+
+
+def _hash_file(path, prefix_size=0):
+    # SHA-1 của cả file và của ``prefix_size`` byte đầu (None nếu không áp dụng), một lượt đọc
+    digest = hashlib.sha1()
+    prefix = None
+    offset = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            cut = prefix_size - offset
+            offset += len(block)
+            if prefix is None and 0 < cut <= len(block):
+                digest.update(block[:cut])
+                prefix = digest.hexdigest()
+                block = block[cut:]
+            digest.update(block)
+    return digest.hexdigest(), prefix
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _read_fingerprints():
+    return _read_json(FINGERPRINTS_PATH)
+
+
+def _write_fingerprints(known):
+    _write_json(FINGERPRINTS_PATH, known)
+
+
+def _ends_with_newline(path, size):
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+
+def _record_append(fingerprint, previous):
+    # File mới = file cũ + các dòng nối thêm ở cuối -> ghi lại quan hệ (giữ MAX_APPENDS mục mới nhất)
+    _appends[fingerprint] = previous
+    known = _read_json(APPENDS_PATH)
+    known.pop(fingerprint, None)
+    known[fingerprint] = previous
+    try:
+        _write_json(APPENDS_PATH, dict(list(known.items())[-MAX_APPENDS:]))
+    except OSError:
+        pass
+
+
+def extends_version(old_version, new_version):
+    """True nếu dữ liệu ``new_version`` là dữ liệu ``old_version`` cộng thêm các dòng ở cuối.
+
+    Chỉ dựa vào quan hệ nối thêm mà ``dataset_version`` đã ghi nhận khi băm file mới
+    (phần đầu có cùng SHA-1 với phiên bản trước), nên không phải đọc lại dữ liệu.
+    """
+    old_fingerprint, _, old_definitions = old_version.rpartition("-")
+    fingerprint, _, definitions = new_version.rpartition("-")
+    if definitions != old_definitions:
+        return False
+    known = None
+    seen = set()
+    while fingerprint != old_fingerprint:
+        if fingerprint in seen:
+            return False
+        seen.add(fingerprint)
+        previous = _appends.get(fingerprint)
+        if previous is None:
+            if known is None:
+                known = _read_json(APPENDS_PATH)
+            previous = known.get(fingerprint)
+            if previous is None:
+                return False
+        fingerprint = previous
+    return True
+
+
+def dataset_version(path):
+    """Phiên bản dữ liệu: dấu vân tay nội dung file + định nghĩa các đặc trưng dẫn xuất.
+
+    Dấu vân tay được nhớ theo (đường dẫn, kích thước, mtime) trong tiến trình và trong
+    ``fingerprints.json``, nên file lớn (chế độ streaming) chỉ bị băm lại khi thay đổi.
+    """
+    stat = os.stat(path)
+    source = os.path.abspath(path)
+    key = f"{source}:{stat.st_size}:{stat.st_mtime_ns}"
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        known = _read_fingerprints()
+        fingerprint = known.get(key)
+        if fingerprint is None:
+            # Phiên bản trước của cùng file: nếu file chỉ dài thêm thì băm phần đầu cùng lượt
+            previous = [(k, v) for k, v in known.items() if k.startswith(f"{source}:")]
+            previous_size = int(previous[-1][0].rsplit(":", 2)[1]) if previous else 0
+            if not 0 < previous_size < stat.st_size:
+                previous_size = 0
+            fingerprint, prefix = _hash_file(path, previous_size)
+            if prefix is not None and prefix == previous[-1][1] and _ends_with_newline(path, previous_size):
+                _record_append(fingerprint, prefix)
+            # Chỉ giữ phiên bản mới nhất của mỗi file
+            known = {k: v for k, v in known.items() if not k.startswith(f"{source}:")}
+            known[key] = fingerprint
+            try:
+                _write_fingerprints(known)
+            except OSError:
+                pass
+        _fingerprints[key] = fingerprint
+    return f"{fingerprint}-{definitions_hash()}"
+
+
+def _read_csv(path):
+    df = normalize_columns(pd.read_csv(path))
+    return add_derived_features(optimize_dtypes(df))
+
+
+def _read_snapshot(path, snapshot_path):
+    try:
+        import pyarrow as pa
+
+        # Memory-map file Arrow IPC (không nén): các cột số/category trỏ thẳng vào trang
+        # của file, chỉ đọc, nên mọi session và mọi tiến trình cùng đọc chung page cache
+        # của hệ điều hành thay vì mỗi nơi giữ một bản trên heap
+        table = pa.ipc.open_file(pa.memory_map(snapshot_path)).read_all()
+        return table.to_pandas(split_blocks=True)
+    except ImportError:
+        # Không có pyarrow -> đọc thẳng từ CSV
+        return _read_csv(path)
+    except (OSError, ValueError):
+        # Snapshot hỏng -> xóa và dựng lại
+        os.remove(snapshot_path)
+        return None
+
+
+def _write_snapshot(df, snapshot_path):
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, snapshot_path)
+        return True
+    except ImportError:
+        return False
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _snapshot_files(stem):
+    # Tên snapshot: <stem>-<dấu vân tay>-<hash định nghĩa>.arrow; khớp đúng mẫu để không
+    # đụng snapshot của file khác có tên bắt đầu bằng cùng stem (vd. data.csv và data-2.csv)
+    pattern = re.compile(re.escape(stem) + r"-[0-9a-f]+-[0-9a-f]+" + re.escape(SNAPSHOT_SUFFIX))
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    return [os.path.join(SNAPSHOT_DIR, name) for name in os.listdir(SNAPSHOT_DIR) if pattern.fullmatch(name)]
+
+
+def _remove_snapshots(stem, keep=None):
+    for snapshot_path in _snapshot_files(stem):
+        if snapshot_path != keep:
+            try:
+                os.remove(snapshot_path)
+            except OSError:
+                pass
+
+
+def _load_frame(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    # Snapshot chứa cả các cột dẫn xuất -> khóa gồm nội dung file và định nghĩa đặc trưng
+    version = dataset_version(path)
+    snapshot_path = os.path.join(SNAPSHOT_DIR, f"{stem}-{version}{SNAPSHOT_SUFFIX}")
+
+    df = None
+    if os.path.exists(snapshot_path):
+        df = _read_snapshot(path, snapshot_path)
+    if df is None:
+        df = _read_csv(path)
+        if _write_snapshot(df, snapshot_path):
+            # Mỗi phiên bản CSV là một bản sao đầy đủ -> chỉ giữ snapshot của phiên bản hiện tại
+            _remove_snapshots(stem, keep=snapshot_path)
+            # Đọc lại qua memory map để bản trên heap vừa parse từ CSV được giải phóng
+            mapped = _read_snapshot(path, snapshot_path)
+            df = df if mapped is None else mapped
+
+    df.attrs["version"] = version
+    return df
+
+
+def load_data(path):
+    """Đọc dataset, ưu tiên snapshot Arrow (memory-map) và cache trong tiến trình.
+
+    Snapshot chỉ được dựng lại khi nội dung file CSV thay đổi; khóa cache
+    trong bộ nhớ là (đường dẫn, kích thước, mtime) nên các lần gọi lặp lại
+    không cần đọc lại file. Mỗi tiến trình giữ đúng một bảng, dữ liệu chỉ đọc:
+    mỗi lời gọi nhận một view không sao chép (pandas copy-on-write sẽ chỉ
+    sao chép cột nào bị người gọi ghi đè).
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    with _lock:
+        df = _frames.get(key)
+        if df is None:
+            df = _load_frame(path)
+            # Bỏ các phiên bản cũ của cùng file
+            for old_key in [k for k in _frames if k[0] == key[0]]:
+                del _frames[old_key]
+            _frames[key] = df
+
+    # View nông: người gọi có thể thêm/ghi cột mà không ảnh hưởng bảng dùng chung
+    return df.copy(deep=False)
+
+
+def clear_cache(path=None):
+    """Xóa cache trong tiến trình; nếu có ``path`` thì xóa luôn các snapshot của file đó."""
+    with _lock:
+        _frames.clear()
+        _fingerprints.clear()
+        _appends.clear()
+    if path is None or not os.path.isdir(SNAPSHOT_DIR):
+        return
+    source = os.path.abspath(path)
+    known = _read_fingerprints()
+    if any(k.startswith(f"{source}:") for k in known):
+        _write_fingerprints({k: v for k, v in known.items() if not k.startswith(f"{source}:")})
+    _remove_snapshots(os.path.splitext(os.path.basename(path))[0])
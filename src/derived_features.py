@@ -0,0 +1,91 @@
+import hashlib
+import json
+
+import numpy as np
+
+# Số dòng mỗi khối khi tính (giới hạn bộ nhớ tạm với dataset lớn)
+BLOCK_ROWS = 1 << 20
+
+
+class DerivedFeature:
+    """Đặc trưng dẫn xuất dạng tuyến tính: ``intercept + Σ weight·cột``.
+
+    Cột "tính ngược" như ``10 - Stress`` được khai báo bằng trọng số âm và phần
+    hằng số đưa vào ``intercept`` (0.25·(10 - x) = 2.5 - 0.25·x).
+    """
+
+    def __init__(self, name, weights, intercept=0.0, description=""):
+        self.name = name
+        self.weights = dict(weights)
+        self.intercept = float(intercept)
+        self.description = description
+
+    @property
+    def inputs(self):
+        return list(self.weights)
+
+    def definition(self):
+        return {"name": self.name, "weights": self.weights, "intercept": self.intercept}
+
+
+DIGITAL_WELLBEING_INDEX = DerivedFeature(
+    "Digital_Wellbeing_Index",
+    {
+        "Sleep_Quality1_10": 0.25,
+        "Stress_Level1_10": -0.25,
+        "Happiness_Index1_10": 0.20,
+        "Exercise_Frequencyweek": 0.15,
+        "Daily_Screen_Timehrs": -0.15,
+    },
+    # 0.25·10 (Stress) + 0.15·10 (Screen Time)
+    intercept=4.0,
+    description="Chỉ số sức khỏe tinh thần tổng hợp từ giấc ngủ, stress, hạnh phúc, vận động và screen time.",
+)
+
+# Registry: thêm đặc trưng mới ở đây là đủ để có trong snapshot, EDA và trang ML
+DERIVED_FEATURES = [DIGITAL_WELLBEING_INDEX]
+
+
+def derived_names(features=None):
+    return [f.name for f in (DERIVED_FEATURES if features is None else features)]
+
+
+def get_feature(name):
+    return next(f for f in DERIVED_FEATURES if f.name == name)
+
+
+def definitions_hash(features=None):
+    """Băm định nghĩa các đặc trưng; đổi trọng số -> snapshot cũ bị bỏ qua."""
+    features = DERIVED_FEATURES if features is None else features
+    payload = json.dumps([f.definition() for f in features], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def add_derived_features(df, features=None):
+    """Thêm các cột dẫn xuất vào ``df`` trong một lượt tính.
+
+    Mọi đặc trưng được gộp thành một ma trận trọng số W (cột đầu vào × đặc trưng),
+    nên cả registry chỉ là một phép nhân ma trận ``X @ W + b`` trên từng khối dòng,
+    không tạo Series trung gian cho từng số hạng. Đặc trưng thiếu cột đầu vào được bỏ qua.
+    """
+    features = DERIVED_FEATURES if features is None else features
+    features = [f for f in features if all(col in df.columns for col in f.inputs)]
+    if not features:
+        return df
+
+    inputs = list(dict.fromkeys(col for f in features for col in f.inputs))
+    weights = np.zeros((len(inputs), len(features)))
+    for j, feature in enumerate(features):
+        for col, weight in feature.weights.items():
+            weights[inputs.index(col), j] = weight
+    intercepts = np.array([f.intercept for f in features])
+
+    source = df[inputs]
+    out = np.empty((len(df), len(features)), dtype=np.float32)
+    for start in range(0, len(df), BLOCK_ROWS):
+        block = source.iloc[start:start + BLOCK_ROWS].to_numpy(dtype=np.float64, na_value=np.nan)
+        out[start:start + len(block)] = block @ weights + intercepts
+
+    for j, feature in enumerate(features):
+        df[feature.name] = out[:, j]
+    return df
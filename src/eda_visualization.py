@@ -1,40 +1,167 @@
+import os
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 import plotly.express as px
-from src.data_loader import load_data
-from sklearn.cluster import KMeans
+from src.artifacts import fetch
+from src.covariance_engine import CovarianceCube
+from src.data_loader import DATA_PATH, dataset_version, load_data
+from src.derived_features import DIGITAL_WELLBEING_INDEX
+from src.segmentation import DEFAULT_FEATURES, UserSegmentation
+from src.filter_index import FilterIndex
+from src.instrumentation import span, timed
+from src.plot_rendering import histogram, scatter, scatter_3d
+from src.streaming_stats import (
+    CORR_COLUMNS, DEFAULT_CHUNKSIZE, PLATFORM_COLUMNS, SAMPLE_SIZE,
+    compute_eda_tables, distinct_values, filter_rows, read_chunks, should_stream
+)
 
-def show_eda_dashboard():
-    st.title("📊 EDA Dashboard – Phân tích dữ liệu")
-    st.markdown("""
-    Phần này hiển thị các biểu đồ và thống kê mô tả để tìm hiểu mối quan hệ giữa **sử dụng mạng xã hội**, 
-    **giấc ngủ**, **stress**, **vận động** và **chỉ số hạnh phúc**.
-    """)
+DWI = DIGITAL_WELLBEING_INDEX.name
+WELLBEING_COLUMNS = [
+    DWI, "Sleep_Quality1_10", "Stress_Level1_10", "Happiness_Index1_10",
+    "Daily_Screen_Timehrs", "Exercise_Frequencyweek",
+]
 
-    # --- LOAD DATA ---
-    df = load_data("data/Mental_Health_and_Social_Media_Balance_Dataset.csv")
 
-    # --- SIDEBAR FILTERS ---
-    st.sidebar.subheader("⚙️ Bộ lọc tương tác")
-    age_range = st.sidebar.slider("Chọn độ tuổi", int(df["Age"].min()), int(df["Age"].max()), (20, 40))
-    platform = st.sidebar.selectbox("Chọn nền tảng mạng xã hội", df["Social_Media_Platform"].unique())
+@timed("eda.streamed_tables")
+@st.cache_resource(show_spinner="Đang tính thống kê theo khối...", max_entries=64)
+def _streamed_tables(path, mtime, age_range, platform, chunksize):
+    # Dùng chung giữa các session (chỉ đọc); mẫu vẽ biểu đồ chỉ cần cho bảng tổng quan
+    overview = age_range is None and platform is None
+    return compute_eda_tables(read_chunks(path, chunksize), age_range, platform,
+                              sample_size=SAMPLE_SIZE if overview else None)
+
+
+@st.cache_resource(max_entries=16)
+def _segmentation(n_clusters, features, _version):
+    # Một mô hình phân nhóm cho mỗi cấu hình, sống qua các phiên bản dữ liệu: update() tự
+    # partial_fit khi CSV được nối thêm dòng và fit lại khi bị thay thế. _version không nằm
+    # trong khóa, chỉ dùng để lấy mô hình đã fit sẵn trong bundle artifact cho lần tạo đầu
+    return fetch(_version, _segmentation_key(n_clusters, features),
+                 lambda: UserSegmentation(n_clusters=n_clusters, features=list(features)))
+
+
+def _segmentation_key(n_clusters, features):
+    return f"eda/segmentation/{n_clusters}/{'+'.join(features)}"
+
 
-    df_filtered = df[
-        (df["Age"] >= age_range[0]) &
-        (df["Age"] <= age_range[1]) &
-        (df["Social_Media_Platform"] == platform)
-    ]
+def _filter_key(platform, age_range):
+    # Tên artifact của một tổ hợp bộ lọc; không lọc = "all"
+    if platform is None and age_range is None:
+        return "all"
+    return f"{platform}/{age_range[0]}-{age_range[1]}"
 
-    st.write(f"Hiển thị {len(df_filtered)} bản ghi phù hợp với bộ lọc.")
 
-    # --- SUMMARY STATISTICS ---
+@timed("eda.dataset_index")
+@st.cache_resource(show_spinner="Đang dựng chỉ mục bộ lọc...")
+def _dataset_index(version, _df):
+    # Dựng một lần cho mỗi phiên bản dữ liệu, dùng chung giữa các session
+    return {
+        "index": FilterIndex(_df),
+        "covariance": CovarianceCube().update(_df),
+    }
+
+
+@timed("eda.heatmap")
+@st.cache_data(show_spinner=False)
+def _heatmap(version, title, corr, color_scale):
+    # Heatmap plotly dựng một lần cho mỗi (phiên bản dữ liệu, ma trận), không vẽ lại mỗi lần rerun
+    fig = px.imshow(corr, text_auto=".2f", zmin=-1, zmax=1, color_continuous_scale=color_scale,
+                    aspect="auto", title=title)
+    fig.update_xaxes(side="bottom")
+    return fig
+
+
+def _correlation_heatmap(version, covariance, platform=None, age_range=None):
+    # Ma trận của bộ lọc được gộp từ các ô của cube hiệp phương sai, không đọc lại dữ liệu
+    if platform is None and age_range is None:
+        return _heatmap(version, "Toàn bộ dữ liệu", covariance.corr(CORR_COLUMNS).round(4), "RdBu_r")
+    corr = covariance.corr(CORR_COLUMNS, platform=platform, age_range=age_range)
+    return _heatmap(version, f"{platform}, {age_range[0]}–{age_range[1]} tuổi", corr.round(4), "RdBu_r")
+
+
+def _wellbeing_heatmap(version, covariance):
+    return _heatmap(version, None, covariance.corr(WELLBEING_COLUMNS).round(4), "YlGnBu")
+
+
+@timed("eda.distribution_figures")
+@st.cache_data(show_spinner=False)
+def _distribution_figures(version, platform, age_range, _df_filtered, _age_hist, _gender_counts, _avg_df):
+    # Các biểu đồ của bộ lọc hiện tại, chỉ dựng lại khi phiên bản dữ liệu hoặc bộ lọc đổi
+    fig1 = px.histogram(_age_hist, x="Age", y="count", histfunc="sum", nbins=15, color="Gender",
+                        title="Phân bố độ tuổi")
+    fig1.update_yaxes(title_text="count")
+    fig2 = px.pie(values=_gender_counts.values, names=_gender_counts.index, title="Tỷ lệ giới tính")
+    fig3 = scatter(
+        _df_filtered, x="Daily_Screen_Timehrs", y="Stress_Level1_10",
+        color="Gender", trendline=True,
+        title="Ảnh hưởng của thời gian sử dụng mạng xã hội đến stress"
+    )
+    fig4 = px.line(
+        _df_filtered.sort_values("Sleep_Quality1_10"),
+        x="Sleep_Quality1_10", y="Happiness_Index1_10",
+        markers=True, title="Giấc ngủ ảnh hưởng thế nào đến hạnh phúc?"
+    )
+    fig5 = px.box(
+        _df_filtered, x="Exercise_Frequencyweek", y="Stress_Level1_10",
+        color="Gender", title="Phân bố stress theo tần suất vận động"
+    )
+    fig6 = px.bar(
+        _avg_df, x="Social_Media_Platform", y=["Happiness_Index1_10", "Stress_Level1_10"],
+        barmode="group", title="So sánh trung bình Stress & Happiness giữa các nền tảng"
+    )
+    return fig1, fig2, fig3, fig4, fig5, fig6
+
+
+@timed("eda.wellbeing_data")
+@st.cache_data(show_spinner=False)
+def _wellbeing_data(version, _df):
+    # DWI đã được tính sẵn lúc nạp dữ liệu (src/derived_features.py)
+    fig_dwi = histogram(
+        _df, x=DWI, color="Gender",
+        nbins=20, title="Phân bố chỉ số Digital Wellbeing theo giới tính",
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+    return fig_dwi, _df[DWI].mean()
+
+
+@timed("eda.figure_3d")
+@st.cache_data(show_spinner=False)
+def _figure_3d(version, _df):
+    return scatter_3d(
+        _df, x="Sleep_Quality1_10", y="Stress_Level1_10", z="Happiness_Index1_10",
+        color="Gender", size="Exercise_Frequencyweek",
+        title="3D: Giấc ngủ – Stress – Hạnh phúc",
+        color_discrete_sequence=px.colors.qualitative.Dark24
+    )
+
+
+def _indexed_view(cached, platform, age_range):
+    # Thống kê lấy từ cube (tổng trên khoảng tuổi), dòng lấy bằng binary search
+    index = cached["index"]
+    tables = {
+        "n_filtered": index.count(platform, age_range),
+        "summary": index.summary(platform, age_range),
+        "gender_counts": index.gender_counts(platform, age_range),
+        "platform_means": index.group_means(PLATFORM_COLUMNS),
+        "corr": cached["covariance"].corr(CORR_COLUMNS),
+        "covariance": cached["covariance"],
+    }
+    return tables, index.slice(platform, age_range), index.age_histogram(platform, age_range)
+
+
+def _sample_view(sample, platform, age_range):
+    # Chế độ streaming: biểu đồ theo dòng vẽ trên mẫu ngẫu nhiên
+    df_filtered = filter_rows(sample, age_range, platform)
+    age_hist = df_filtered.groupby(["Age", "Gender"], observed=True).size().rename("count").reset_index()
+    return df_filtered, age_hist
+
+
+@timed("eda.section.summary")
+def _section_summary(tables):
     st.subheader("📈 Thống kê mô tả (Summary Statistics)")
     st.caption("Bảng dưới đây hiển thị giá trị trung bình, độ lệch chuẩn, nhỏ nhất và lớn nhất (theo dữ liệu đã lọc).")
 
-    summary = df_filtered.describe().loc[["mean", "std", "min", "max"]].T
-    summary = summary.rename(columns={
+    summary = tables["summary"].rename(columns={
         "mean": "Trung bình",
         "std": "Độ lệch chuẩn",
         "min": "Nhỏ nhất",
@@ -42,100 +169,62 @@ def show_eda_dashboard():
     })
     st.dataframe(summary)
 
+
+@timed("eda.section.distributions")
+def _section_distributions(version, platform, age_range, df_filtered, age_hist, tables):
+    key = _filter_key(platform, age_range)
+    fig1, fig2, fig3, fig4, fig5, fig6 = fetch(version, f"eda/distribution/{key}", lambda: _distribution_figures(
+        version, platform, age_range, df_filtered, age_hist, tables["gender_counts"], tables["platform_means"]
+    ))
+
     # --- 1️⃣ Phân bố độ tuổi & giới tính ---
     st.subheader("1️⃣ Phân bố độ tuổi và giới tính")
     col1, col2 = st.columns(2)
-
     with col1:
-        fig1 = px.histogram(df_filtered, x="Age", nbins=15, color="Gender", title="Phân bố độ tuổi")
         st.plotly_chart(fig1, use_container_width=True)
     with col2:
-        gender_counts = df_filtered["Gender"].value_counts()
-        fig2 = px.pie(values=gender_counts.values, names=gender_counts.index, title="Tỷ lệ giới tính")
         st.plotly_chart(fig2, use_container_width=True)
 
     # --- 2️⃣ Tương quan giữa thời gian dùng mạng & stress ---
     st.subheader("2️⃣ Tương quan giữa thời gian dùng mạng và mức độ stress")
-    fig3 = px.scatter(
-        df_filtered, x="Daily_Screen_Timehrs", y="Stress_Level1_10",
-        color="Gender", trendline="ols",
-        title="Ảnh hưởng của thời gian sử dụng mạng xã hội đến stress"
-    )
     st.plotly_chart(fig3, use_container_width=True)
 
     # --- 3️⃣ Mối quan hệ giữa giấc ngủ & hạnh phúc ---
     st.subheader("3️⃣ Mối quan hệ giữa giấc ngủ và chỉ số hạnh phúc")
-    fig4 = px.line(
-        df_filtered.sort_values("Sleep_Quality1_10"),
-        x="Sleep_Quality1_10", y="Happiness_Index1_10",
-        markers=True, title="Giấc ngủ ảnh hưởng thế nào đến hạnh phúc?"
-    )
     st.plotly_chart(fig4, use_container_width=True)
 
     # --- 4️⃣ Ảnh hưởng vận động đến stress ---
     st.subheader("4️⃣ Ảnh hưởng của tần suất vận động đến mức độ stress")
-    fig5 = px.box(
-        df_filtered, x="Exercise_Frequencyweek", y="Stress_Level1_10",
-        color="Gender", title="Phân bố stress theo tần suất vận động"
-    )
     st.plotly_chart(fig5, use_container_width=True)
 
     # --- 5️⃣ So sánh nền tảng mạng xã hội ---
     st.subheader("5️⃣ So sánh giữa các nền tảng mạng xã hội")
-    avg_df = df.groupby("Social_Media_Platform")[["Happiness_Index1_10", "Stress_Level1_10"]].mean().reset_index()
-    fig6 = px.bar(
-        avg_df, x="Social_Media_Platform", y=["Happiness_Index1_10", "Stress_Level1_10"],
-        barmode="group", title="So sánh trung bình Stress & Happiness giữa các nền tảng"
-    )
     st.plotly_chart(fig6, use_container_width=True)
 
-    # --- Correlation Heatmap ---
+
+@timed("eda.section.correlation")
+def _section_correlation(version, tables, platform, age_range):
     st.subheader("🔍 Ma trận tương quan (Heatmap)")
-    corr_cols = ["Sleep_Quality1_10", "Stress_Level1_10", "Daily_Screen_Timehrs", "Happiness_Index1_10"]
-    corr = df[corr_cols].corr()
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
-    st.pyplot(fig)
-
-    # ============================================================
-    # 🌈 PHÂN TÍCH NÂNG CAO
-    # ============================================================
-    st.markdown("---")
-    st.header("🌈 Phân tích nâng cao (Advanced Analysis)")
+    if not st.toggle("Chỉ tính trên dữ liệu đã lọc", value=False):
+        platform = age_range = None
+    fig = fetch(version, f"eda/heatmap/{_filter_key(platform, age_range)}",
+                lambda: _correlation_heatmap(version, tables["covariance"], platform, age_range))
+    st.plotly_chart(fig, use_container_width=True)
+
 
-    # --- 1️⃣ Digital Wellbeing Index ---
+@timed("eda.section.wellbeing")
+def _section_wellbeing(version, df, covariance):
     st.subheader("1️⃣ Chỉ số Digital Wellbeing tổng hợp")
     st.caption("Chỉ số phản ánh sức khỏe tinh thần tổng thể, tính dựa trên giấc ngủ, stress, hạnh phúc, vận động và thời gian dùng mạng.")
 
-    df["Digital_Wellbeing_Index"] = (
-        0.25 * df["Sleep_Quality1_10"] +
-        0.25 * (10 - df["Stress_Level1_10"]) +
-        0.20 * df["Happiness_Index1_10"] +
-        0.15 * df["Exercise_Frequencyweek"] +
-        0.15 * (10 - df["Daily_Screen_Timehrs"])
-    )
-
-    fig_dwi = px.histogram(
-        df, x="Digital_Wellbeing_Index", color="Gender",
-        nbins=20, title="Phân bố chỉ số Digital Wellbeing theo giới tính",
-        color_discrete_sequence=px.colors.qualitative.Pastel
-    )
+    fig_dwi, mean_dwi = fetch(version, "eda/wellbeing", lambda: _wellbeing_data(version, df))
     st.plotly_chart(fig_dwi, use_container_width=True)
-
-    mean_dwi = df["Digital_Wellbeing_Index"].mean()
     st.info(f"🌟 Chỉ số Digital Wellbeing trung bình: **{mean_dwi:.2f}/10**")
 
     # --- 🔍 Tương quan DWI với các yếu tố khác ---
     st.subheader("📈 Mối tương quan giữa Digital Wellbeing và các yếu tố khác")
-    corr_wellbeing = df[[
-        "Digital_Wellbeing_Index", "Sleep_Quality1_10",
-        "Stress_Level1_10", "Happiness_Index1_10",
-        "Daily_Screen_Timehrs", "Exercise_Frequencyweek"
-    ]].corr()
-
-    fig_corr, ax_corr = plt.subplots(figsize=(6, 4))
-    sns.heatmap(corr_wellbeing, annot=True, cmap="YlGnBu", ax=ax_corr)
-    st.pyplot(fig_corr)
+    fig = fetch(version, "eda/heatmap/wellbeing", lambda: _wellbeing_heatmap(version, covariance))
+    st.plotly_chart(fig, use_container_width=True)
     st.info("""
     💡 **Nhận xét nhanh:**
     - Digital Wellbeing tương quan **âm mạnh** với Stress và Screen Time.
@@ -143,39 +232,52 @@ def show_eda_dashboard():
     - → Chứng minh chỉ số DWI phản ánh đúng trạng thái tinh thần của người dùng.
     """)
 
-    # --- 2️⃣ Phân nhóm người dùng (KMeans Clustering) ---
+
+@st.fragment
+@timed("eda.section.clustering")
+def _section_clustering(version, df, streaming):
+    # Fragment: đổi số nhóm/đặc trưng chỉ chạy lại phần này, không chạy lại cả trang
     st.subheader("2️⃣ Phân nhóm người dùng (KMeans Clustering)")
     st.caption("Phân nhóm người dùng dựa trên Screen Time, Sleep, Stress và Happiness để khám phá hành vi tương đồng.")
 
-    features = df[["Daily_Screen_Timehrs", "Sleep_Quality1_10", "Stress_Level1_10", "Happiness_Index1_10"]]
-    kmeans = KMeans(n_clusters=3, random_state=42)
-    df["Cluster"] = kmeans.fit_predict(features)
+    c1, c2 = st.columns([1, 3])
+    n_clusters = c1.slider("Số nhóm", 2, 8, 3)
+    numeric_cols = list(df.select_dtypes("number").columns)
+    features = c2.multiselect("Đặc trưng dùng để phân nhóm", numeric_cols, default=DEFAULT_FEATURES)
+    if not features:
+        features = DEFAULT_FEATURES
 
-    fig_cluster = px.scatter(
-        df, x="Daily_Screen_Timehrs", y="Happiness_Index1_10",
-        color=df["Cluster"].astype(str),
+    segmentation = _segmentation(n_clusters, tuple(features), version)
+    with span("eda.kmeans") as s:
+        # Chế độ streaming: df là mẫu ngẫu nhiên, không phải các dòng của phiên bản dữ liệu
+        s.payload = clusters = segmentation.update(df, None if streaming else version).astype(str)
+
+    fig_cluster = scatter(
+        df.assign(Cluster=clusters), x="Daily_Screen_Timehrs", y="Happiness_Index1_10",
+        color="Cluster",
+        category_orders={"Cluster": [str(i) for i in range(n_clusters)]},
         title="Phân nhóm người dùng theo hành vi & mức độ hạnh phúc",
         hover_data=["Stress_Level1_10", "Sleep_Quality1_10"],
         color_discrete_sequence=px.colors.qualitative.Bold
     )
     st.plotly_chart(fig_cluster, use_container_width=True)
 
-    st.success("""
-    🔍 **Phân tích nhanh:**
-    - Nhóm 0: Screen time cao, stress cao, happiness thấp.
-    - Nhóm 1: Trung bình ở các yếu tố.
-    - Nhóm 2: Ngủ tốt, ít stress, hạnh phúc cao.
-    """)
+    st.caption("Tâm của từng nhóm (nhóm được đánh số theo mức Happiness tăng dần):")
+    st.dataframe(segmentation.centroids.round(2))
+
+    if n_clusters == 3:
+        st.success("""
+        🔍 **Phân tích nhanh:**
+        - Nhóm 0: Screen time cao, stress cao, happiness thấp.
+        - Nhóm 1: Trung bình ở các yếu tố.
+        - Nhóm 2: Ngủ tốt, ít stress, hạnh phúc cao.
+        """)
 
-    # --- 3️⃣ Biểu đồ 3D ---
+
+@timed("eda.section.3d")
+def _section_3d(version, df):
     st.subheader("3️⃣ Mối quan hệ 3 chiều: Giấc ngủ – Stress – Hạnh phúc")
-    fig_3d = px.scatter_3d(
-        df, x="Sleep_Quality1_10", y="Stress_Level1_10", z="Happiness_Index1_10",
-        color="Gender", size="Exercise_Frequencyweek",
-        title="3D: Giấc ngủ – Stress – Hạnh phúc",
-        color_discrete_sequence=px.colors.qualitative.Dark24
-    )
-    st.plotly_chart(fig_3d, use_container_width=True)
+    st.plotly_chart(fetch(version, "eda/figure_3d", lambda: _figure_3d(version, df)), use_container_width=True)
 
     st.info("""
     💡 **Nhận xét:**
@@ -184,6 +286,83 @@ def show_eda_dashboard():
     - Giới tính chỉ ảnh hưởng nhỏ, Sleep mới là yếu tố chính.
     """)
 
+
+def show_eda_dashboard():
+    st.title("📊 EDA Dashboard – Phân tích dữ liệu")
+    st.markdown("""
+    Phần này hiển thị các biểu đồ và thống kê mô tả để tìm hiểu mối quan hệ giữa **sử dụng mạng xã hội**, 
+    **giấc ngủ**, **stress**, **vận động** và **chỉ số hạnh phúc**.
+    """)
+
+    # --- LOAD DATA ---
+    # File quá lớn -> thống kê tính theo khối, biểu đồ vẽ trên mẫu ngẫu nhiên
+    streaming = should_stream(DATA_PATH)
+    if streaming:
+        mtime = os.path.getmtime(DATA_PATH)
+        version = dataset_version(DATA_PATH)
+        overview = fetch(version, f"eda/tables/{_filter_key(None, None)}",
+                         lambda: _streamed_tables(DATA_PATH, mtime, None, None, DEFAULT_CHUNKSIZE))
+        df = overview["sample"]
+        age_min, age_max = overview["age_min"], overview["age_max"]
+        platforms = overview["platform_means"]["Social_Media_Platform"]
+        st.caption(f"⚡ Dataset lớn: thống kê được tính theo khối {DEFAULT_CHUNKSIZE:,} dòng, "
+                   f"biểu đồ dùng mẫu ngẫu nhiên {len(df):,} dòng.")
+    else:
+        with span("eda.load_data") as s:
+            s.payload = df = load_data(DATA_PATH)
+        version = df.attrs["version"]
+        cached = _dataset_index(version, df)
+        index = cached["index"]
+        age_min, age_max = index.age_min, index.age_max
+        platforms = index.platforms
+
+    # --- SIDEBAR FILTERS ---
+    st.sidebar.subheader("⚙️ Bộ lọc tương tác")
+    age_range = st.sidebar.slider("Chọn độ tuổi", int(age_min), int(age_max), (20, 40))
+    platform = st.sidebar.selectbox("Chọn nền tảng mạng xã hội", platforms)
+
+    if streaming:
+        tables = fetch(version, f"eda/tables/{_filter_key(platform, age_range)}",
+                       lambda: _streamed_tables(DATA_PATH, mtime, age_range, platform, DEFAULT_CHUNKSIZE))
+        with span("eda.filter") as s:
+            df_filtered, age_hist = _sample_view(df, platform, age_range)
+            s.payload = df_filtered
+    else:
+        with span("eda.filter") as s:
+            tables, df_filtered, age_hist = _indexed_view(cached, platform, age_range)
+            s.payload = df_filtered
+
+    st.write(f"Hiển thị {tables['n_filtered']} bản ghi phù hợp với bộ lọc.")
+
+    # --- Các phần của trang: chỉ phần đang mở mới được tính và hiển thị ---
+    basic_tab, dist_tab, corr_tab, dwi_tab, cluster_tab, tab_3d = st.tabs([
+        "📈 Thống kê mô tả",
+        "📊 Phân bố & so sánh",
+        "🔍 Ma trận tương quan",
+        "🌈 Digital Wellbeing",
+        "🧩 Phân nhóm người dùng",
+        "🧊 Biểu đồ 3D",
+    ], key="eda_section", on_change="rerun")
+
+    with basic_tab:
+        if basic_tab.open:
+            _section_summary(tables)
+    with dist_tab:
+        if dist_tab.open:
+            _section_distributions(version, platform, age_range, df_filtered, age_hist, tables)
+    with corr_tab:
+        if corr_tab.open:
+            _section_correlation(version, tables, platform, age_range)
+    with dwi_tab:
+        if dwi_tab.open:
+            _section_wellbeing(version, df, tables["covariance"])
+    with cluster_tab:
+        if cluster_tab.open:
+            _section_clustering(version, df, streaming)
+    with tab_3d:
+        if tab_3d.open:
+            _section_3d(version, df)
+
     # --- 🧩 Tổng kết Insight ---
     st.markdown("---")
     st.header("🧠 Tổng kết nhanh từ EDA")
@@ -194,3 +373,61 @@ def show_eda_dashboard():
     - 📱 Chỉ số Digital Wellbeing chứng minh tác động tiêu cực của Screen Time đến sức khỏe tinh thần.
     - 🌈 Cluster 2 đại diện nhóm người dùng có lối sống cân bằng – mục tiêu hướng đến.
     """)
+
+
+# --- Dựng sẵn artifact (python -m src.artifacts) ---
+def precompute_tasks(path, age_ranges):
+    """Các job dựng sẵn artifact của trang: tổng quan + mỗi (nền tảng, khoảng tuổi)."""
+    if should_stream(path):
+        platforms = distinct_values(path, "Social_Media_Platform")
+    else:
+        platforms = _dataset_index(dataset_version(path), load_data(path))["index"].platforms
+    tasks = [(precompute_overview, (path,))]
+    tasks += [(precompute_filter, (path, platform, age_range)) for platform in platforms for age_range in age_ranges]
+    return tasks
+
+
+def precompute_overview(path):
+    version = dataset_version(path)
+    artifacts = {}
+    if should_stream(path):
+        tables = _streamed_tables(path, os.path.getmtime(path), None, None, DEFAULT_CHUNKSIZE)
+        artifacts[f"eda/tables/{_filter_key(None, None)}"] = tables
+        df = tables["sample"]
+        rows_version = None
+    else:
+        df = load_data(path)
+        tables = _dataset_index(version, df)
+        rows_version = version
+    segmentation = UserSegmentation(n_clusters=3, features=DEFAULT_FEATURES)
+    segmentation.update(df, rows_version)
+    artifacts.update({
+        f"eda/heatmap/{_filter_key(None, None)}": _correlation_heatmap(version, tables["covariance"]),
+        "eda/heatmap/wellbeing": _wellbeing_heatmap(version, tables["covariance"]),
+        "eda/wellbeing": _wellbeing_data(version, df),
+        "eda/figure_3d": _figure_3d(version, df),
+        _segmentation_key(3, DEFAULT_FEATURES): segmentation,
+    })
+    return artifacts
+
+
+def precompute_filter(path, platform, age_range):
+    version = dataset_version(path)
+    key = _filter_key(platform, age_range)
+    artifacts = {}
+    if should_stream(path):
+        # Một lượt đọc cho cả bảng đã lọc và mẫu vẽ biểu đồ: mẫu giống hệt mẫu của bảng
+        # tổng quan (cùng seed, cùng thứ tự khối)
+        tables = compute_eda_tables(read_chunks(path, DEFAULT_CHUNKSIZE), age_range, platform,
+                                    sample_size=SAMPLE_SIZE)
+        df_filtered, age_hist = _sample_view(tables["sample"], platform, age_range)
+        tables["sample"] = None
+        artifacts[f"eda/tables/{key}"] = tables
+    else:
+        cached = _dataset_index(version, load_data(path))
+        tables, df_filtered, age_hist = _indexed_view(cached, platform, age_range)
+    artifacts[f"eda/distribution/{key}"] = _distribution_figures(
+        version, platform, age_range, df_filtered, age_hist, tables["gender_counts"], tables["platform_means"]
+    )
+    artifacts[f"eda/heatmap/{key}"] = _correlation_heatmap(version, tables["covariance"], platform, age_range)
+    return artifacts
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """Chỉ mục cho bộ lọc (nền tảng, độ tuổi) của EDA dashboard.
+
+    - Các dòng được sắp theo (Social_Media_Platform, Age): lấy dòng theo bộ lọc
+      là một lát cắt liên tục tìm bằng binary search.
+    - Khối dữ liệu (cube) theo (nền tảng, tuổi, giới tính) lưu count, sum, sum of
+      squares (cộng dồn theo trục tuổi), min và max của từng cột số: thống kê mô tả,
+      tỷ lệ giới tính và histogram độ tuổi được tính từ tổng trên khoảng tuổi,
+      không phụ thuộc số dòng.
+    """
+
+    def __init__(self, df, platform_col="Social_Media_Platform", age_col="Age", gender_col="Gender"):
+        self.platform_col, self.age_col, self.gender_col = platform_col, age_col, gender_col
+        self.columns = list(df.select_dtypes("number").columns)
+
+        platform = df[platform_col].astype("category")
+        gender = df[gender_col].astype("category")
+        self.platforms = list(platform.cat.categories)
+        self.genders = list(gender.cat.categories)
+        ages = np.rint(df[age_col].to_numpy(dtype=np.float64)).astype(np.int64)
+        self.age_min, self.age_max = int(ages.min()), int(ages.max())
+
+        p_codes = platform.cat.codes.to_numpy().astype(np.int64)
+        g_codes = gender.cat.codes.to_numpy().astype(np.int64)
+        a_codes = ages - self.age_min
+
+        # --- Sắp dòng theo (platform, age) ---
+        order = np.lexsort((a_codes, p_codes))
+        self.rows = df.iloc[order]
+        self._ages = ages[order]
+        self._offsets = np.searchsorted(p_codes[order], np.arange(len(self.platforms) + 1))
+
+        # --- Cube count / sum / sumsq / min / max ---
+        shape = (len(self.platforms), self.age_max - self.age_min + 1, len(self.genders))
+        n_cells = int(np.prod(shape))
+        valid = (p_codes >= 0) & (g_codes >= 0)
+        cell = np.ravel_multi_index((p_codes[valid], a_codes[valid], g_codes[valid]), shape)
+        values = df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+
+        k = len(self.columns)
+        counts = np.empty((n_cells, k))
+        sums = np.empty((n_cells, k))
+        sumsq = np.empty((n_cells, k))
+        for j in range(k):
+            counts[:, j] = np.bincount(cell, weights=present[:, j], minlength=n_cells)
+            sums[:, j] = np.bincount(cell, weights=filled[:, j], minlength=n_cells)
+            sumsq[:, j] = np.bincount(cell, weights=filled[:, j] ** 2, minlength=n_cells)
+        extremes = pd.DataFrame(values, columns=self.columns).groupby(cell).agg(["min", "max"])
+        mins = np.full((n_cells, k), np.inf)
+        maxs = np.full((n_cells, k), -np.inf)
+        mins[extremes.index] = extremes.xs("min", axis=1, level=1).fillna(np.inf).to_numpy()
+        maxs[extremes.index] = extremes.xs("max", axis=1, level=1).fillna(-np.inf).to_numpy()
+
+        rows_per_cell = np.bincount(cell, minlength=n_cells).reshape(shape)
+        self._rows_cum = self._cumulate(rows_per_cell)
+        self._count_cum = self._cumulate(counts.reshape(shape + (k,)))
+        self._sum_cum = self._cumulate(sums.reshape(shape + (k,)))
+        self._sumsq_cum = self._cumulate(sumsq.reshape(shape + (k,)))
+        self._mins = mins.reshape(shape + (k,))
+        self._maxs = maxs.reshape(shape + (k,))
+
+    @staticmethod
+    def _cumulate(cube):
+        # Tổng cộng dồn theo trục tuổi, thêm một lớp 0 ở đầu để lấy tổng khoảng [lo, hi]
+        pad = [(0, 0)] * cube.ndim
+        pad[1] = (1, 0)
+        return np.pad(cube, pad).cumsum(axis=1)
+
+    def _selection(self, platform=None, age_range=None):
+        if platform is None:
+            platforms = slice(None)
+        elif platform in self.platforms:
+            platforms = self.platforms.index(platform)
+        else:
+            platforms = slice(0, 0)
+        lo, hi = (self.age_min, self.age_max) if age_range is None else age_range
+        lo = min(max(int(np.ceil(lo)), self.age_min), self.age_max + 1)
+        hi = max(min(int(np.floor(hi)), self.age_max), self.age_min - 1)
+        return platforms, lo - self.age_min, max(hi - self.age_min + 1, lo - self.age_min)
+
+    def _range_sum(self, cube, platform, age_range):
+        platforms, lo, hi = self._selection(platform, age_range)
+        total = cube[platforms, hi] - cube[platforms, lo]
+        return total.sum(axis=0) if isinstance(platforms, slice) else total
+
+    def count(self, platform=None, age_range=None):
+        return int(self._range_sum(self._rows_cum, platform, age_range).sum())
+
+    def summary(self, platform=None, age_range=None):
+        """mean/std/min/max theo cột, giống ``df_filtered.describe().loc[[...]].T``."""
+        n = self._range_sum(self._count_cum, platform, age_range).sum(axis=0)
+        s = self._range_sum(self._sum_cum, platform, age_range).sum(axis=0)
+        ss = self._range_sum(self._sumsq_cum, platform, age_range).sum(axis=0)
+        platforms, lo, hi = self._selection(platform, age_range)
+        mins = self._mins[platforms, lo:hi].reshape(-1, len(self.columns))
+        maxs = self._maxs[platforms, lo:hi].reshape(-1, len(self.columns))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = s / n
+            var = np.maximum(ss - s * mean, 0.0) / (n - 1)
+        return pd.DataFrame({
+            "mean": np.where(n > 0, mean, np.nan),
+            "std": np.where(n > 1, np.sqrt(var), np.nan),
+            "min": np.where(n > 0, mins.min(axis=0, initial=np.inf), np.nan),
+            "max": np.where(n > 0, maxs.max(axis=0, initial=-np.inf), np.nan),
+        }, index=self.columns)
+
+    def gender_counts(self, platform=None, age_range=None):
+        counts = pd.Series(self._range_sum(self._rows_cum, platform, age_range), index=self.genders, dtype=np.int64)
+        return counts[counts > 0].sort_values(ascending=False)
+
+    def age_histogram(self, platform=None, age_range=None):
+        """Số dòng theo (Age, Gender) trong bộ lọc, dùng để vẽ histogram độ tuổi."""
+        platforms, lo, hi = self._selection(platform, age_range)
+        counts = np.diff(self._rows_cum[platforms, lo:hi + 1], axis=-2)
+        if isinstance(platforms, slice):
+            counts = counts.sum(axis=0)
+        ages = np.arange(lo, hi) + self.age_min
+        hist = pd.DataFrame(counts, index=pd.Index(ages, name=self.age_col), columns=self.genders)
+        hist = hist.stack().rename("count").reset_index().rename(columns={"level_1": self.gender_col})
+        return hist[hist["count"] > 0].reset_index(drop=True)
+
+    def group_means(self, columns):
+        """Trung bình theo nền tảng (toàn bộ độ tuổi), giống ``groupby(platform).mean()``."""
+        idx = [self.columns.index(c) for c in columns]
+        totals = self._count_cum[:, -1].sum(axis=1)[:, idx]
+        sums = self._sum_cum[:, -1].sum(axis=1)[:, idx]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = pd.DataFrame(sums / totals, index=pd.Index(self.platforms, name=self.platform_col), columns=columns)
+        return means[totals.sum(axis=1) > 0].reset_index()
+
+    def slice(self, platform=None, age_range=None):
+        """Các dòng thỏa bộ lọc, lấy bằng binary search trên dữ liệu đã sắp xếp."""
+        if platform is None:
+            mask = np.ones(len(self.rows), dtype=bool)
+            if age_range is not None:
+                mask = (self._ages >= age_range[0]) & (self._ages <= age_range[1])
+            return self.rows[mask]
+        if platform not in self.platforms:
+            return self.rows.iloc[0:0]
+        p = self.platforms.index(platform)
+        start, stop = self._offsets[p], self._offsets[p + 1]
+        if age_range is not None:
+            ages = self._ages[start:stop]
+            start, stop = (start + np.searchsorted(ages, age_range[0], side="left"),
+                           start + np.searchsorted(ages, age_range[1], side="right"))
+        return self.rows.iloc[start:stop]
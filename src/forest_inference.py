@@ -0,0 +1,171 @@
+"""Suy luận Random Forest trên mảng NumPy liền, không qua ``predict`` của từng cây sklearn.
+
+Xuất pipeline Random Forest mặc định ra file ``.npz`` (dùng được với batch scoring)::
+
+    python -m src.forest_inference forest.npz
+"""
+import argparse
+
+import numpy as np
+
+# Số cặp (cây, dòng) duyệt cùng lúc: một dòng -> mọi cây trong một lượt; lô lớn -> từng ít
+# cây một, để mảng nút đang đọc nằm gọn trong cache CPU
+GROUP_NODES = 1 << 14
+# Số dòng tối đa của một khối khi dự đoán lô lớn
+BLOCK_ROWS = 1 << 16
+
+
+class CompiledForest:
+    """StandardScaler + RandomForestRegressor dưới dạng các mảng nút liền nhau.
+
+    Nút của mọi cây được nối vào chung ``feature``, ``threshold``, ``children`` (cặp con
+    trái/phải, chỉ số đã cộng offset của cây) và ``value``. Nút lá trỏ về chính nó, nên
+    duyệt một nhóm cây là ``depths`` bước gather trên mọi cặp (cây, dòng) cùng lúc, không
+    có vòng lặp Python theo dòng.
+
+    Kết quả giống hệt ``pipeline.predict`` từng bit: chuẩn hóa cùng kiểu dữ liệu như
+    StandardScaler, ép float32 trước khi so với ngưỡng float64 như cây sklearn, NaN đi
+    theo ``missing_go_to_left``, giá trị lá cộng theo thứ tự cây rồi chia cho số cây.
+    """
+
+    def __init__(self, feature, threshold, children, value, missing_left, roots, depths,
+                 mean=None, scale=None, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.depths = depths
+        self.mean = mean
+        self.scale = scale
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def max_depth(self):
+        return int(self.depths.max())
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Biên dịch pipeline ``scaler`` + ``model`` (RandomForestRegressor một đầu ra) đã fit."""
+        scaler, model = pipeline.named_steps.get("scaler"), pipeline.named_steps["model"]
+        if not hasattr(model, "estimators_") or model.n_outputs_ != 1:
+            raise ValueError("Chỉ biên dịch được RandomForestRegressor một đầu ra đã fit")
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+
+        feature, threshold, children, value, missing_left = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left < 0
+            # Lá: con trái = con phải = chính nó, feature 0 cho hợp lệ khi gather
+            left = np.where(leaf, nodes, tree.children_left) + offset
+            right = np.where(leaf, nodes, tree.children_right) + offset
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            children.append(np.column_stack([left, right]).ravel())
+            value.append(tree.value[:, 0, 0])
+            missing_left.append(tree.missing_go_to_left.astype(bool))
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.intp),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            children=np.concatenate(children).astype(np.intp),
+            value=np.concatenate(value).astype(np.float64),
+            missing_left=np.concatenate(missing_left),
+            roots=offsets.astype(np.intp),
+            depths=np.array([tree.max_depth for tree in trees], dtype=np.intp),
+            mean=None if scaler is None else scaler.mean_,
+            scale=None if scaler is None else scaler.scale_,
+            feature_names=getattr(pipeline, "feature_names_in_", None),
+        )
+
+    def transform(self, X):
+        """Chuẩn hóa như ``StandardScaler.transform``: giữ float32/float64, kiểu khác -> float64."""
+        X = np.asarray(X)
+        if X.dtype not in (np.float32, np.float64):
+            X = X.astype(np.float64)
+        if self.mean is not None:
+            X = X - self.mean.astype(X.dtype)
+        if self.scale is not None:
+            X = X / self.scale.astype(X.dtype)
+        return X
+
+    def _predict_block(self, X):
+        n_rows = len(X)
+        # Theo cột: các dòng cùng đặc trưng nằm liền nhau, chỉ số = feature * n_rows + dòng
+        columns = np.ascontiguousarray(X.T).ravel()
+        has_nan = np.isnan(columns).any()
+        group = max(1, min(self.n_estimators, GROUP_NODES // n_rows))
+        rows = np.tile(np.arange(n_rows), group)
+        total = np.zeros(n_rows)
+        for start in range(0, self.n_estimators, group):
+            roots = self.roots[start:start + group]
+            nodes = np.repeat(roots, n_rows)
+            row = rows[:len(nodes)]
+            for _ in range(self.depths[start:start + group].max()):
+                x = columns[self.feature[nodes] * n_rows + row]
+                # NaN > ngưỡng là False -> sang trái, trừ nút học được "missing đi phải"
+                go_right = x > self.threshold[nodes]
+                if has_nan:
+                    go_right |= np.isnan(x) & ~self.missing_left[nodes]
+                nodes = self.children[2 * nodes + go_right]
+            # Cộng dồn tại chỗ theo thứ tự cây (không dùng tổng pairwise) như RandomForestRegressor
+            for leaf in self.value[nodes].reshape(len(roots), n_rows):
+                total += leaf
+        return total
+
+    def predict(self, X):
+        # Cây sklearn làm việc trên float32; so sánh với ngưỡng float64 sau khi nâng lại
+        X = self.transform(X).astype(np.float32).astype(np.float64)
+        out = np.empty(len(X))
+        for start in range(0, len(X), BLOCK_ROWS):
+            out[start:start + BLOCK_ROWS] = self._predict_block(X[start:start + BLOCK_ROWS])
+        out /= self.n_estimators
+        return out
+
+    def save(self, path):
+        arrays = {name: getattr(self, name) for name in
+                  ("feature", "threshold", "children", "value", "missing_left", "roots")}
+        if self.mean is not None:
+            arrays["mean"] = self.mean
+        if self.scale is not None:
+            arrays["scale"] = self.scale
+        if hasattr(self, "feature_names_in_"):
+            arrays["feature_names"] = self.feature_names_in_.astype(str)
+        np.savez(path, depths=self.depths, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        return cls(**arrays)
+
+
+def compile_pipeline(pipeline):
+    """``CompiledForest`` nếu pipeline là Random Forest, không thì ``None``."""
+    try:
+        return CompiledForest.from_pipeline(pipeline)
+    except (KeyError, ValueError):
+        return None
+
+
+def main(argv=None):
+    from src.model_registry import get_default_pipeline
+
+    parser = argparse.ArgumentParser(description="Xuất Random Forest của model registry ra mảng nút NumPy (.npz).")
+    parser.add_argument("output", help="File .npz")
+    args = parser.parse_args(argv)
+
+    forest = CompiledForest.from_pipeline(get_default_pipeline("Random Forest"))
+    forest.save(args.output)
+    print(f"Đã xuất {forest.n_estimators} cây, {len(forest.value):,} nút, độ sâu {forest.max_depth} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
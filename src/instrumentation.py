@@ -0,0 +1,388 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.data_loader import CACHE_DIR
+
+# --- Cấu hình: bật sẵn cho mọi session bằng DASHBOARD_PERF=1, hoặc bật trong sidebar ---
+ENABLED = os.environ.get("DASHBOARD_PERF", "0") == "1"
+# tracemalloc đo chính xác đỉnh bộ nhớ của từng span nhưng làm chậm code cấp phát nhiều
+# (fit Random Forest chậm ~7 lần); mặc định chỉ đo mức tăng của đỉnh RSS tiến trình
+TRACEMALLOC = os.environ.get("DASHBOARD_PERF_TRACEMALLOC", "0") == "1"
+PERF_DIR = os.path.join(CACHE_DIR, "perf")
+LOG_PATH = os.environ.get("DASHBOARD_PERF_LOG", os.path.join(PERF_DIR, "spans.jsonl"))
+PROM_PATH = os.environ.get("DASHBOARD_PERF_PROM", os.path.join(PERF_DIR, "dashboard.prom"))
+
+# Trạng thái của lượt chạy script hiện tại (mỗi session Streamlit chạy trên thread riêng)
+_state = threading.local()
+# Khóa session_state: lựa chọn bật/tắt của session (cho các lượt fragment chạy lại, vốn không
+# đi qua start_run) và các span của fragment chờ hiển thị ở lượt chạy đầy đủ tiếp theo
+ENABLED_KEY = "_perf_enabled"
+FRAGMENT_RECORDS_KEY = "_perf_fragment_records"
+# Số span fragment giữ lại tối đa cho panel
+MAX_FRAGMENT_RECORDS = 200
+# Tổng hợp toàn tiến trình cho file Prometheus
+_totals = {}
+_io_lock = threading.Lock()
+
+
+class Span:
+    """Một đoạn được đo; gán ``payload`` để ghi lại kích thước kết quả."""
+
+    def __init__(self, name, parent, depth):
+        self.name = name
+        self.parent = parent
+        self.depth = depth
+        self.payload = None
+        self.mem_start = 0
+        self.mem_peak = 0
+        self.tracing = False
+        self.rss_start = None
+
+
+def _session_state():
+    # session_state của lượt chạy hiện tại, None khi chạy ngoài Streamlit (job, script)
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    return st.session_state if get_script_run_ctx(suppress_warning=True) is not None else None
+
+
+def _enabled():
+    if hasattr(_state, "enabled"):
+        return _state.enabled
+    # Thread chưa qua start_run (fragment chạy lại trên thread mới) -> lựa chọn của session
+    session = _session_state()
+    return session.get(ENABLED_KEY, ENABLED) if session is not None else ENABLED
+
+
+def _max_rss():
+    """Đỉnh RSS của tiến trình (byte), ``None`` nếu hệ điều hành không hỗ trợ."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về byte
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def resident_bytes():
+    """RSS hiện tại của tiến trình (byte), ``None`` nếu hệ điều hành không hỗ trợ.
+
+    Gồm cả các trang của snapshot đã memory-map: chúng nằm trong page cache và được
+    chia sẻ giữa các tiến trình, nên con số này là giới hạn trên của bộ nhớ riêng.
+    """
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def active_sessions():
+    """Số session Streamlit đang kết nối, ``None`` khi không chạy trong server (AppTest, script)."""
+    try:
+        from streamlit.runtime import Runtime
+
+        if not Runtime.exists():
+            return None
+        return Runtime.instance()._session_mgr.num_active_sessions()
+    except (ImportError, AttributeError, RuntimeError):
+        return None
+
+
+def memory_usage():
+    """RSS tiến trình, số session và RSS chia đều cho mỗi session (byte)."""
+    rss, sessions = resident_bytes(), active_sessions()
+    per_session = rss / (sessions or 1) if rss is not None else None
+    return {"rss_bytes": rss, "sessions": sessions, "per_session_bytes": per_session}
+
+
+def _records():
+    if not hasattr(_state, "records"):
+        _state.records, _state.stack = [], []
+    return _state.records
+
+
+def start_run(name, enabled=ENABLED):
+    """Gọi ở đầu mỗi lượt chạy script: bắt đầu danh sách span mới và span gốc ``name``."""
+    flush()
+    _state.enabled = enabled
+    _state.records, _state.stack = [], []
+    _state.run_span = None
+    session = _session_state()
+    if session is not None:
+        session[ENABLED_KEY] = enabled
+    if not enabled:
+        return
+    if TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _state.run_span = _open(name)
+
+
+def end_run():
+    """Đóng span gốc, ghi các span của lượt chạy ra file và trả về chúng để hiển thị."""
+    if getattr(_state, "run_span", None) is not None:
+        _close(_state.run_span, ok=True)
+        _state.run_span = None
+    records = list(_records())
+    flush()
+    return records
+
+
+@contextmanager
+def span(name):
+    """Đo thời gian thực, CPU, đỉnh bộ nhớ tăng thêm và kích thước payload của một đoạn code.
+
+    CPU là ``process_time`` (cộng cả các thread của joblib/BLAS) nên CPU > wall nghĩa là
+    đoạn đó chạy song song. Bộ nhớ mặc định là mức tăng đỉnh RSS của tiến trình (bằng 0
+    nếu span không vượt đỉnh cũ); với ``DASHBOARD_PERF_TRACEMALLOC=1`` là đỉnh cấp phát
+    Python/NumPy của riêng span. Cả hai đều gần đúng khi nhiều session chạy cùng lúc.
+    Khi instrumentation tắt, span không làm gì.
+    """
+    if not _enabled():
+        yield Span(name, None, 0)
+        return
+
+    current = _open(name)
+    ok = False
+    try:
+        yield current
+        ok = True
+    finally:
+        _close(current, ok)
+
+
+def _open(name):
+    _records()
+    stack = _state.stack
+    current = Span(name, stack[-1].name if stack else None, len(stack))
+    if tracemalloc.is_tracing():
+        # Lưu đỉnh của span cha trước khi reset để span con không làm mất nó
+        mem, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+        tracemalloc.reset_peak()
+        current.mem_start = current.mem_peak = mem
+        current.tracing = True
+    else:
+        current.rss_start = _max_rss()
+    stack.append(current)
+    current.wall_start, current.cpu_start = time.perf_counter(), time.process_time()
+    return current
+
+
+def _close(current, ok):
+    wall = time.perf_counter() - current.wall_start
+    cpu = time.process_time() - current.cpu_start
+    stack = _state.stack
+    # Span gốc có thể còn span con chưa đóng nếu script bị dừng giữa chừng (st.stop, rerun)
+    while stack and stack.pop() is not current:
+        pass
+    peak_delta = None
+    if current.tracing and tracemalloc.is_tracing():
+        current.mem_peak = max(current.mem_peak, tracemalloc.get_traced_memory()[1])
+        peak_delta = current.mem_peak - current.mem_start
+        if stack:
+            stack[-1].mem_peak = max(stack[-1].mem_peak, current.mem_peak)
+    elif current.rss_start is not None:
+        peak_delta = _max_rss() - current.rss_start
+    _records().append({
+        "ts": time.time(),
+        "span": current.name,
+        "parent": current.parent,
+        "depth": current.depth,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "peak_mem_bytes": peak_delta,
+        "payload_bytes": payload_size(current.payload),
+        "ok": ok,
+        "pid": os.getpid(),
+    })
+
+
+def _in_run():
+    return getattr(_state, "run_span", None) is not None or bool(getattr(_state, "stack", None))
+
+
+def fragment_records():
+    """Lấy (và xóa) các span của những lần fragment chạy lại kể từ lượt chạy đầy đủ trước."""
+    session = _session_state()
+    return session.pop(FRAGMENT_RECORDS_KEY, []) if session is not None else []
+
+
+def timed(name):
+    """Decorator: bọc hàm trong ``span(name)``, payload là giá trị trả về.
+
+    Đặt phía trên ``st.cache_data`` để đo cả lần trúng cache, phía dưới ``st.fragment``
+    để đo cả các lần fragment tự chạy lại. Lần chạy lại của fragment không đi qua
+    ``start_run``/``end_run`` của app.py, nên được mở thành một lượt riêng: span được ghi
+    ra file ngay và giữ trong session_state để panel hiển thị ở lượt chạy đầy đủ sau.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled() or _in_run():
+                with span(name) as s:
+                    result = fn(*args, **kwargs)
+                    s.payload = result
+                return result
+            start_run(name, enabled=True)
+            try:
+                result = fn(*args, **kwargs)
+                _state.run_span.payload = result
+            finally:
+                records = end_run()
+                # Thread có thể được dùng lại cho session khác -> lượt sau lại đọc session_state
+                del _state.enabled
+                session = _session_state()
+                if session is not None:
+                    kept = session.get(FRAGMENT_RECORDS_KEY, []) + records
+                    session[FRAGMENT_RECORDS_KEY] = kept[-MAX_FRAGMENT_RECORDS:]
+            return result
+        return wrapper
+    return decorate
+
+
+def payload_size(obj, _depth=0):
+    """Kích thước (byte) gần đúng của kết quả; ``None`` nếu không đo được."""
+    if obj is None or _depth > 2:
+        return None
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(index=True)))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if type(obj).__module__.startswith("plotly.graph_objs"):
+        # Ước lượng theo dữ liệu của các trace (kiểm tra theo module để không phải import
+        # plotly); không serialize JSON vì tốn ngang chính đoạn vẽ biểu đồ đang được đo
+        return sum(_nested_size(trace.to_plotly_json()) for trace in obj.data)
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (list, tuple)):
+        sizes = [payload_size(item, _depth + 1) for item in obj]
+        sizes = [size for size in sizes if size is not None]
+        return sum(sizes) if sizes else None
+    return None
+
+
+def _nested_size(obj):
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(_nested_size(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        if obj and not isinstance(obj[0], (dict, list, tuple, str, np.ndarray)):
+            return 8 * len(obj)
+        return sum(_nested_size(item) for item in obj)
+    return 8
+
+
+def flush():
+    """Nối các span chưa ghi vào file JSONL và cập nhật file Prometheus."""
+    records = _records()
+    if not records:
+        return
+    pending = list(records)
+    records.clear()
+    with _io_lock:
+        for record in pending:
+            total = _totals.setdefault(record["span"], {"count": 0, "wall": 0.0, "cpu": 0.0, "mem": 0, "payload": 0})
+            total["count"] += 1
+            total["wall"] += record["wall_s"]
+            total["cpu"] += record["cpu_s"]
+            total["mem"] = max(total["mem"], record["peak_mem_bytes"] or 0)
+            total["payload"] = record["payload_bytes"] or total["payload"]
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(LOG_PATH)), exist_ok=True)
+            with open(LOG_PATH, "a") as f:
+                for record in pending:
+                    f.write(json.dumps(record) + "\n")
+            _write_prometheus(PROM_PATH)
+        except OSError:
+            # Không ghi được file (thư mục chỉ đọc...) thì vẫn hiển thị trên panel
+            pass
+
+
+def _write_prometheus(path):
+    # Định dạng textfile của node_exporter; ghi ra file tạm rồi thay thế để collector không đọc dở
+    metrics = [
+        ("dashboard_span_wall_seconds_total", "counter", "Tổng thời gian thực của span", "wall"),
+        ("dashboard_span_cpu_seconds_total", "counter", "Tổng thời gian CPU của span", "cpu"),
+        ("dashboard_span_calls_total", "counter", "Số lần span được gọi", "count"),
+        ("dashboard_span_peak_memory_bytes", "gauge", "Đỉnh bộ nhớ tăng thêm lớn nhất của span", "mem"),
+        ("dashboard_span_payload_bytes", "gauge", "Kích thước payload gần nhất của span", "payload"),
+    ]
+    lines = []
+    for metric, kind, help_text, field in metrics:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for name, total in sorted(_totals.items()):
+            lines.append(f'{metric}{{span="{name}"}} {total[field]}')
+    gauges = [
+        ("dashboard_process_resident_bytes", "RSS của tiến trình server", "rss_bytes"),
+        ("dashboard_active_sessions", "Số session đang kết nối", "sessions"),
+        ("dashboard_resident_bytes_per_session", "RSS chia cho số session", "per_session_bytes"),
+    ]
+    memory = memory_usage()
+    for metric, help_text, field in gauges:
+        if memory[field] is not None:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge", f"{metric} {memory[field]:.0f}"]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def spans_frame(records):
+    """Bảng span cho panel (tên thụt lề theo độ sâu, đơn vị ms/MB/KB)."""
+    return pd.DataFrame({
+        "Span": ["  " * r["depth"] + r["span"] for r in records],
+        "Wall (ms)": [r["wall_s"] * 1000 for r in records],
+        "CPU (ms)": [r["cpu_s"] * 1000 for r in records],
+        "Peak mem (MB)": [r["peak_mem_bytes"] / 2**20 if r["peak_mem_bytes"] is not None else None for r in records],
+        "Payload (KB)": [r["payload_bytes"] / 2**10 if r["payload_bytes"] is not None else None for r in records],
+    })
+
+
+def show_performance_panel(records):
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        if not records:
+            st.caption("Chưa có span nào trong lượt chạy này.")
+            return
+        # Span được ghi khi kết thúc -> sắp lại theo thứ tự bắt đầu
+        records = sorted(records, key=lambda r: r["ts"] - r["wall_s"])
+        total = sum(r["wall_s"] for r in records if r["depth"] == 0)
+        st.caption(f"Tổng {total * 1000:.0f} ms cho {len(records)} span. Log: `{LOG_PATH}`")
+        memory = memory_usage()
+        if memory["rss_bytes"] is not None:
+            sessions = memory["sessions"] or 1
+            st.caption(f"RSS tiến trình {memory['rss_bytes'] / 2**20:.0f} MB · {sessions} session · "
+                       f"{memory['per_session_bytes'] / 2**20:.1f} MB/session")
+        st.dataframe(spans_frame(records).round(1), hide_index=True)
+        fragments = fragment_records()
+        if fragments:
+            st.caption(f"Các phần chạy lại riêng (fragment) kể từ lượt trước: {len(fragments)} span")
+            st.dataframe(spans_frame(sorted(fragments, key=lambda r: r["ts"] - r["wall_s"])).round(1),
+                         hide_index=True)
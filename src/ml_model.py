@@ -2,153 +2,390 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
+from joblib import Parallel, delayed
+from sklearn.model_selection import KFold
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from src.data_loader import load_data
+from src.artifacts import fetch
+from src.data_loader import DATA_PATH, load_data
+from src.derived_features import DERIVED_FEATURES, add_derived_features, derived_names
+from src.instrumentation import span, timed
+from src.plot_rendering import histogram, scatter
+from src.model_registry import (
+    DEFAULT_PARAMS, FEATURE_COLUMNS, MODEL_FACTORIES, TARGET_COLUMN,
+    build_pipeline, data_fingerprint, get_pipeline, get_predictor, happiness_band, pipeline_key, target_dependent,
+    training_split, tuned_info
+)
+from src.tuning import ETA, MAX_TREES, halving_schedule, tune_random_forest
 import numpy as np
 
-def show_ml_section():
-    st.title("🤖 Machine Learning – Dự đoán chỉ số Happiness")
+METRICS = ["MAE", "RMSE", "R²", "Adj R²"]
 
-    # --- Load dữ liệu ---
-    df = load_data("data/Mental_Health_and_Social_Media_Balance_Dataset.csv")
+# Ô nhập của form dự đoán: cột -> (nhãn, min, max, mặc định, bước)
+FORM_INPUTS = {
+    "Daily_Screen_Timehrs": ("Screen Time (giờ/ngày)", 0.0, 12.0, 4.0, 0.1),
+    "Sleep_Quality1_10": ("Sleep Quality (1-10)", 1, 10, 7, 1),
+    "Stress_Level1_10": ("Stress Level (1-10)", 1, 10, 5, 1),
+    "Exercise_Frequencyweek": ("Exercise Frequency (lần/tuần)", 0, 7, 3, 1),
+    "Happiness_Index1_10": ("Happiness Index (1-10)", 1, 10, 7, 1),
+}
 
-    # --- Chọn các đặc trưng (features) và nhãn (target) ---
-    X = df[["Daily_Screen_Timehrs", "Sleep_Quality1_10", "Stress_Level1_10", "Exercise_Frequencyweek"]]
-    y = df["Happiness_Index1_10"]
 
-    # --- Chuẩn hóa dữ liệu ---
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+def regression_metrics(y_true, y_pred, n_features):
+    n = len(y_true)
+    r2 = r2_score(y_true, y_pred)
+    return {
+        "MAE": mean_absolute_error(y_true, y_pred),
+        "RMSE": mean_squared_error(y_true, y_pred) ** 0.5,
+        "R²": r2,
+        "Adj R²": 1 - (1 - r2) * (n - 1) / (n - n_features - 1),
+    }
 
-    # --- Chia dữ liệu ---
-    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
 
-    # --- Chọn mô hình ---
-    model_type = st.radio("Chọn mô hình dự đoán:", ["Linear Regression", "Random Forest"])
-    if model_type == "Linear Regression":
-        model = LinearRegression()
-    else:
-        model = RandomForestRegressor(random_state=42, n_estimators=200)
+def _score_fold(name, model_type, params, X, y, train_idx, test_idx, fold):
+    # Mỗi tiến trình chỉ dùng 1 core cho forest để tránh tranh chấp CPU
+    pipeline = build_pipeline(model_type, params, n_jobs=1)
+    pipeline.fit(X.iloc[train_idx], y.iloc[train_idx])
+    y_pred = pipeline.predict(X.iloc[test_idx])
+    return {"Mô hình": name, "Fold": fold, **regression_metrics(y.iloc[test_idx], y_pred, X.shape[1])}
 
-    # --- Huấn luyện ---
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
 
-    # --- Đánh giá mô hình ---
-    mae = mean_absolute_error(y_test, y_pred)
-    rmse = mean_squared_error(y_test, y_pred) ** 0.5
-    r2 = r2_score(y_test, y_pred)
-    n = len(y_test)
-    p = X_test.shape[1]
-    adj_r2 = 1 - (1 - r2) * (n - 1) / (n - p - 1)  # Adjusted R²
+def compare_models(X, y, models=None, n_splits=5, n_jobs=-1, random_state=42):
+    """So sánh các mô hình bằng k-fold CV, chạy song song các cặp (mô hình, fold) trên process pool.
 
-    st.markdown("### 📊 Hiệu suất mô hình")
-    col1, col2, col3 = st.columns(3)
-    col1.metric("MAE", f"{mae:.3f}")
-    col2.metric("RMSE", f"{rmse:.3f}")
-    col3.metric("R²", f"{r2:.3f}")
+    ``models`` là dict {tên hiển thị: (loại mô hình trong MODEL_FACTORIES, params)};
+    mặc định so sánh mọi mô hình đã đăng ký với tham số mặc định.
+    Trả về (bảng mean/std theo mô hình, bảng điểm từng fold).
+    """
+    if models is None:
+        models = {name: (name, DEFAULT_PARAMS[name]) for name in MODEL_FACTORIES}
+    X = X.reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    folds = list(KFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X))
+
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_score_fold)(name, model_type, params, X, y, train_idx, test_idx, fold)
+        for name, (model_type, params) in models.items()
+        for fold, (train_idx, test_idx) in enumerate(folds)
+    )
+    fold_df = pd.DataFrame(scores)
+    summary = fold_df.groupby("Mô hình", sort=False)[METRICS].agg(["mean", "std"])
+    summary.columns = [f"{metric} {stat}" for metric, stat in summary.columns]
+    return summary.reset_index(), fold_df
+
+
+@timed("ml.cross_validation")
+@st.cache_data(show_spinner="Đang chạy k-fold cross-validation...")
+def _cached_comparison(version, features, n_splits, _X, _y):
+    return compare_models(_X, _y, n_splits=n_splits)
+
+
+def _model_key(model_type, params, fingerprint):
+    # Tên artifact của một mô hình: cùng khóa với model registry (loại, tham số, dữ liệu train)
+    params = DEFAULT_PARAMS[model_type] if params is None else params
+    return f"ml/{pipeline_key(model_type, params, fingerprint)}"
+
+
+def _comparison_key(features, n_splits):
+    return f"ml/comparison/{'+'.join(features)}/{n_splits}"
 
-    col4, col5 = st.columns(2)
-    col4.metric("Adj R²", f"{adj_r2:.3f}")
-    col5.metric("Samples", f"{n}")
 
-    
+def _feature_importance(model, columns):
+    if not hasattr(model, "feature_importances_"):
+        return None
+    return pd.Series(model.feature_importances_, index=list(columns), name="importance")
 
-    # --- So sánh Linear vs Random Forest ---
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _shared_split(version, features, _df):
+    # Một phép chia train/test (và dấu vân tay của nó) cho mỗi (phiên bản dữ liệu, tập đặc
+    # trưng), dùng chung cho mọi session thay vì mỗi session giữ một bản sao; chỉ đọc
+    X_train, X_test, y_train, y_test = training_split(_df, list(features))
+    return X_train, X_test, y_train, y_test, data_fingerprint(X_train, y_train)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _shared_predictions(version, model_type, features, params, _pipeline, _X_test):
+    # Dự đoán trên tập test chỉ phụ thuộc (dữ liệu, mô hình, tham số) -> tính một lần cho cả tiến trình
+    y_pred = _pipeline.predict(_X_test)
+    y_pred.setflags(write=False)
+    return y_pred
+
+
+@timed("ml.diagnostic_figures")
+@st.cache_data(show_spinner=False)
+def _diagnostic_figures(version, model_type, features, params, _y_test, _y_pred):
+    # Chỉ dựng lại khi dữ liệu hoặc mô hình thay đổi
+    compare_df = pd.DataFrame({"Thực tế": _y_test, "Dự đoán": _y_pred})
+    fig1 = scatter(compare_df, x="Thực tế", y="Dự đoán", trendline=True,
+                   title="Biểu đồ: Thực tế vs Dự đoán Happiness")
+    y_min, y_max = min(_y_test.min(), _y_pred.min()), max(_y_test.max(), _y_pred.max())
+    fig1.add_trace(go.Scatter(x=[y_min, y_max], y=[y_min, y_max],
+                              mode='lines', name='Đường lý tưởng', line=dict(color='red', dash='dash')))
+
+    errors = _y_test - _y_pred
+    fig2 = histogram(errors.rename("Sai số").to_frame(), x="Sai số", nbins=20,
+                     title="Phân bố sai số giữa thực tế và dự đoán",
+                     color_discrete_sequence=['#E45756'])
+
+    error_df = pd.DataFrame({"Predicted": _y_pred, "Error": errors})
+    fig_err = scatter(
+        error_df, x="Predicted", y="Error", trendline=True,
+        title="Mối quan hệ giữa sai số và giá trị dự đoán",
+        color_discrete_sequence=["#4C78A8"]
+    )
+    return fig1, fig2, fig_err
+
+
+@st.fragment
+@timed("ml.section.comparison")
+def _section_comparison(version, X, y):
+    # Fragment: đổi số fold chỉ chạy lại phần so sánh
     st.markdown("### ⚖️ So sánh hiệu suất các mô hình")
-    models = {
-        "Linear Regression": LinearRegression(),
-        "Random Forest": RandomForestRegressor(random_state=42, n_estimators=200)
-    }
+    n_splits = st.slider("Số fold (k-fold CV)", 3, 10, 5)
+    results_df, _ = fetch(version, _comparison_key(X.columns, n_splits),
+                          lambda: _cached_comparison(version, tuple(X.columns), n_splits, X, y))
+
+    table = pd.DataFrame({"Mô hình": results_df["Mô hình"]})
+    for metric in METRICS:
+        table[metric] = [
+            f"{m:.3f} ± {s:.3f}" for m, s in zip(results_df[f"{metric} mean"], results_df[f"{metric} std"])
+        ]
+    st.dataframe(table, hide_index=True)
 
-    results = []
-    for name, m in models.items():
-        m.fit(X_train, y_train)
-        y_pred_model = m.predict(X_test)
-        results.append({
-            "Mô hình": name,
-            "R²": r2_score(y_test, y_pred_model),
-            "RMSE": mean_squared_error(y_test, y_pred_model) ** 0.5,
-            "MAE": mean_absolute_error(y_test, y_pred_model)
-        })
-
-    results_df = pd.DataFrame(results)
     fig_compare = px.bar(
         results_df,
         x="Mô hình",
-        y="R²",
+        y="R² mean",
+        error_y="R² std",
         color="Mô hình",
-        text=results_df["R²"].apply(lambda x: f"{x:.2f}"),
-        title="So sánh R² giữa Linear Regression và Random Forest",
+        text=results_df["R² mean"].apply(lambda x: f"{x:.2f}"),
+        title=f"So sánh R² giữa các mô hình ({n_splits}-fold CV, trung bình ± độ lệch chuẩn)",
+        labels={"R² mean": "R²"},
         color_discrete_sequence=px.colors.qualitative.Set2
     )
     fig_compare.update_traces(textposition='outside')
     st.plotly_chart(fig_compare, use_container_width=True)
 
-    # --- Biểu đồ so sánh thực tế vs dự đoán ---
+
+@timed("ml.section.predictions")
+def _section_predictions(fig1):
     st.markdown("### 🔍 So sánh giá trị thực tế và dự đoán")
-    compare_df = pd.DataFrame({"Thực tế": y_test, "Dự đoán": y_pred})
-    fig1 = px.scatter(compare_df, x="Thực tế", y="Dự đoán", trendline="ols",
-                      title="Biểu đồ: Thực tế vs Dự đoán Happiness")
-    fig1.add_trace(go.Scatter(x=[y.min(), y.max()], y=[y.min(), y.max()],
-                              mode='lines', name='Đường lý tưởng', line=dict(color='red', dash='dash')))
     st.plotly_chart(fig1, use_container_width=True)
 
+
+@timed("ml.section.errors")
+def _section_errors(fig2, fig_err):
     # --- Biểu đồ phân bố lỗi ---
     st.markdown("### ⚠️ Phân tích lỗi dự đoán (Error Distribution)")
-    errors = y_test - y_pred
-    fig2 = px.histogram(errors, nbins=20, title="Phân bố sai số giữa thực tế và dự đoán",
-                        color_discrete_sequence=['#E45756'])
     st.plotly_chart(fig2, use_container_width=True)
 
     # --- Biểu đồ Error vs Predicted ---
     st.markdown("### ⚖️ Phân tích lỗi so với giá trị dự đoán (Error vs Predicted)")
-    error_df = pd.DataFrame({"Predicted": y_pred, "Error": errors})
-    fig_err = px.scatter(
-        error_df, x="Predicted", y="Error", trendline="ols",
-        title="Mối quan hệ giữa sai số và giá trị dự đoán",
-        color_discrete_sequence=["#4C78A8"]
-    )
     st.plotly_chart(fig_err, use_container_width=True)
     st.caption("""
     💡 Nếu các điểm phân bố đều quanh trục 0 → mô hình **không bị bias**.  
     Nếu có xu hướng rõ rệt → mô hình **thiếu biến hoặc cần phi tuyến**.
     """)
 
-    # --- Dự đoán thử với input người dùng ---
+
+@st.fragment
+@timed("ml.section.prediction_form")
+def _section_prediction_form(pipeline, columns):
+    # Fragment: kéo slider chỉ chạy lại form dự đoán, không chạy lại cả trang
     st.markdown("### 🎯 Dự đoán chỉ số Happiness cho người dùng mới")
-    c1, c2, c3, c4 = st.columns(4)
-    screen_time = c1.slider("Screen Time (giờ/ngày)", 0.0, 12.0, 4.0, 0.1)
-    sleep_quality = c2.slider("Sleep Quality (1-10)", 1, 10, 7)
-    stress = c3.slider("Stress Level (1-10)", 1, 10, 5)
-    exercise = c4.slider("Exercise Frequency (lần/tuần)", 0, 7, 3)
+    # Đặc trưng dẫn xuất được tính từ các cột gốc, nên form hỏi các cột gốc mà chúng cần
+    derived = [f for f in DERIVED_FEATURES if f.name in columns]
+    inputs = list(dict.fromkeys([c for c in columns if c in FORM_INPUTS] + [c for f in derived for c in f.inputs]))
+    values = {}
+    for col, container in zip(inputs, st.columns(len(inputs))):
+        label, low, high, default, step = FORM_INPUTS[col]
+        values[col] = container.slider(label, low, high, default, step)
 
     if st.button("🔮 Dự đoán"):
-        input_scaled = scaler.transform([[screen_time, sleep_quality, stress, exercise]])
-        prediction = model.predict(input_scaled)[0]
+        input_df = add_derived_features(pd.DataFrame([values]))[columns]
+        # Random Forest: forest đã biên dịch, nhanh hơn predict của sklearn với một dòng
+        prediction = get_predictor(pipeline, len(input_df)).predict(input_df)[0]
         st.success(f"💡 Happiness dự đoán: **{prediction:.2f}/10**")
 
-        if prediction < 5:
+        band = happiness_band(prediction)
+        if band == "warning":
             st.warning("⚠️ Cảnh báo: Chỉ số hạnh phúc thấp – có thể chịu tác động tiêu cực từ stress hoặc thiếu ngủ.")
-        elif prediction < 7:
+        elif band == "info":
             st.info("🙂 Mức hạnh phúc trung bình – có thể cải thiện bằng giảm stress hoặc tăng vận động.")
         else:
             st.success("🌈 Mức hạnh phúc cao – lối sống cân bằng và tích cực!")
 
-    # --- Tầm quan trọng yếu tố (chỉ với Random Forest) ---
-    if model_type == "Random Forest":
-        st.markdown("### 🔬 Tầm quan trọng của các yếu tố (Feature Importance)")
-        importance = model.feature_importances_
-        fig_imp = go.Figure(go.Bar(
-            x=importance,
-            y=X.columns,
-            orientation='h',
-            text=[f"{v:.2%}" for v in importance],
-            textposition="auto"
-        ))
-        fig_imp.update_layout(title="🎯 Mức ảnh hưởng của từng yếu tố đến Happiness")
-        st.plotly_chart(fig_imp, use_container_width=True)
+
+@timed("ml.section.importance")
+def _section_importance(importance):
+    st.markdown("### 🔬 Tầm quan trọng của các yếu tố (Feature Importance)")
+    if importance is None:
+        st.info("Feature importance chỉ có với mô hình Random Forest.")
+        return
+    fig_imp = go.Figure(go.Bar(
+        x=importance,
+        y=importance.index,
+        orientation='h',
+        text=[f"{v:.2%}" for v in importance],
+        textposition="auto"
+    ))
+    fig_imp.update_layout(title="🎯 Mức ảnh hưởng của từng yếu tố đến Happiness")
+    st.plotly_chart(fig_imp, use_container_width=True)
+
+
+@st.fragment
+@timed("ml.section.tuning")
+def _section_tuning(model_type, X_train, y_train, tuned):
+    st.markdown("### 🧪 Tinh chỉnh Random Forest (successive halving)")
+    st.caption("Random search trên max_depth, min_samples_leaf, max_features, max_samples. Mỗi vòng "
+               "chỉ giữ các ứng viên tốt nhất trên tập validation và nuôi tiếp forest của chúng "
+               "(warm_start) thay vì huấn luyện lại từ đầu; các ứng viên chạy song song trên mọi core.")
+    if model_type != "Random Forest":
+        st.info("Chế độ tinh chỉnh chỉ áp dụng cho Random Forest.")
+        return
+
+    c1, c2, c3 = st.columns(3)
+    n_candidates = c1.slider("Số ứng viên", 4, 64, 16)
+    eta = c2.slider("Hệ số loại (eta)", 2, 4, ETA)
+    max_trees = c3.slider("Số cây tối đa", 100, 1000, MAX_TREES, 50)
+    schedule = halving_schedule(n_candidates, eta, max_trees=max_trees)
+    st.caption("Lịch: " + " → ".join(f"{alive} ứng viên × {trees} cây" for alive, trees in schedule))
+
+    if st.button("🚀 Bắt đầu tinh chỉnh"):
+        progress = st.progress(0.0, text="Đang tinh chỉnh...")
+        board = st.empty()
+
+        def report(done, total, leaderboard):
+            progress.progress(done / total, text=f"Đã xây {done:,}/{total:,} cây")
+            board.dataframe(leaderboard.round(4), hide_index=True)
+
+        tune_random_forest(X_train, y_train, n_candidates, eta, max_trees, callback=report)
+        # Chạy lại cả trang để mô hình chính, form dự đoán dùng pipeline vừa tinh chỉnh
+        st.rerun(scope="app")
+
+    if tuned:
+        st.success(f"✅ Đang dùng tham số đã tinh chỉnh (R² validation {tuned['validation_r2']:.3f}, "
+                   f"{tuned['seconds']:.0f}s): `{tuned['params']}`")
+        st.dataframe(pd.DataFrame(tuned["leaderboard"]).round(4), hide_index=True)
+
+
+def show_ml_section():
+    st.title("🤖 Machine Learning – Dự đoán chỉ số Happiness")
+
+    # --- Load dữ liệu ---
+    with span("ml.load_data") as s:
+        s.payload = df = load_data(DATA_PATH)
+    version = df.attrs["version"]
+
+    # --- Chọn mô hình ---
+    model_type = st.radio("Chọn mô hình dự đoán:", list(MODEL_FACTORIES))
+
+    # --- Chọn các đặc trưng (features) và nhãn (target) ---
+    features = st.multiselect("Đặc trưng đầu vào (gồm cả đặc trưng dẫn xuất)",
+                              FEATURE_COLUMNS + derived_names(), default=FEATURE_COLUMNS)
+    features = features or FEATURE_COLUMNS
+    leaking = target_dependent(features)
+    if leaking:
+        st.warning(f"⚠️ {', '.join(leaking)} được tính từ {TARGET_COLUMN} – mô hình sẽ bị rò rỉ nhãn (target leakage).")
+    X = df[features]
+    y = df[TARGET_COLUMN]
+
+    # --- Chia dữ liệu (dùng chung giữa các session) ---
+    X_train, X_test, y_train, y_test, fingerprint = _shared_split(version, tuple(features), df)
+
+    # --- Huấn luyện (pipeline chuẩn hóa + mô hình, lấy từ cache nếu đã fit) ---
+    # Đã tinh chỉnh trên đúng dữ liệu này -> dùng tham số thắng (pipeline có sẵn trong registry)
+    tuned = tuned_info(model_type, fingerprint)
+    params = tuned["params"] if tuned else None
+    if tuned:
+        st.caption(f"🧪 Dùng tham số đã tinh chỉnh: `{params}`")
+    # Mô hình, dự đoán và biểu đồ lấy từ bundle dựng sẵn (python -m src.artifacts) nếu có
+    key = _model_key(model_type, params, fingerprint)
+    with span(f"ml.fit.{model_type}"):
+        pipeline = fetch(version, f"{key}/pipeline", lambda: get_pipeline(
+            model_type, X_train, y_train, params, n_jobs=-1, fingerprint=fingerprint))
+    model = pipeline.named_steps["model"]
+    with span("ml.predict") as s:
+        s.payload = y_pred = fetch(version, f"{key}/y_pred", lambda: _shared_predictions(
+            version, model_type, tuple(features), params, pipeline, X_test))
+
+    # --- Đánh giá mô hình ---
+    scores = regression_metrics(y_test, y_pred, X_test.shape[1])
+    n = len(y_test)
+
+    st.markdown("### 📊 Hiệu suất mô hình")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("MAE", f"{scores['MAE']:.3f}")
+    col2.metric("RMSE", f"{scores['RMSE']:.3f}")
+    col3.metric("R²", f"{scores['R²']:.3f}")
+
+    col4, col5 = st.columns(2)
+    col4.metric("Adj R²", f"{scores['Adj R²']:.3f}")
+    col5.metric("Samples", f"{n}")
+
+    # --- Các phần của trang: chỉ phần đang mở mới được tính và hiển thị ---
+    compare_tab, pred_tab, error_tab, form_tab, imp_tab, tuning_tab = st.tabs([
+        "⚖️ So sánh mô hình",
+        "🔍 Thực tế vs dự đoán",
+        "⚠️ Phân tích lỗi",
+        "🎯 Dự đoán",
+        "🔬 Feature Importance",
+        "🧪 Tinh chỉnh",
+    ], key="ml_section", on_change="rerun")
+
+    with compare_tab:
+        if compare_tab.open:
+            _section_comparison(version, X, y)
+    if pred_tab.open or error_tab.open:
+        fig1, fig2, fig_err = fetch(version, f"{key}/diagnostics", lambda: _diagnostic_figures(
+            version, model_type, tuple(features), params, y_test, y_pred))
+    with pred_tab:
+        if pred_tab.open:
+            _section_predictions(fig1)
+    with error_tab:
+        if error_tab.open:
+            _section_errors(fig2, fig_err)
+    with form_tab:
+        if form_tab.open:
+            _section_prediction_form(pipeline, list(X.columns))
+    with imp_tab:
+        if imp_tab.open:
+            _section_importance(fetch(version, f"{key}/importance", lambda: _feature_importance(model, X.columns)))
+    with tuning_tab:
+        if tuning_tab.open:
+            _section_tuning(model_type, X_train, y_train, tuned)
+
+
+# --- Dựng sẵn artifact (python -m src.artifacts) ---
+def precompute_tasks(path, age_ranges):
+    """Các job dựng sẵn artifact của trang: mỗi mô hình + so sánh k-fold mặc định."""
+    tasks = [(precompute_model, (path, model_type)) for model_type in MODEL_FACTORIES]
+    tasks.append((precompute_comparison, (path, 5)))
+    return tasks
+
+
+def precompute_model(path, model_type, features=None):
+    # Giống show_ml_section với đặc trưng mặc định (và tham số đã tinh chỉnh nếu có)
+    df = load_data(path)
+    version = df.attrs["version"]
+    features = tuple(features or FEATURE_COLUMNS)
+    X_train, X_test, y_train, y_test, fingerprint = _shared_split(version, features, df)
+    tuned = tuned_info(model_type, fingerprint)
+    params = tuned["params"] if tuned else None
+    key = _model_key(model_type, params, fingerprint)
+    pipeline = get_pipeline(model_type, X_train, y_train, params, n_jobs=-1, fingerprint=fingerprint)
+    y_pred = pipeline.predict(X_test)
+    return {
+        f"{key}/pipeline": pipeline,
+        f"{key}/y_pred": y_pred,
+        f"{key}/diagnostics": _diagnostic_figures(version, model_type, features, params, y_test, y_pred),
+        f"{key}/importance": _feature_importance(pipeline.named_steps["model"], features),
+    }
+
+
+def precompute_comparison(path, n_splits, features=None):
+    df = load_data(path)
+    version = df.attrs["version"]
+    features = list(features or FEATURE_COLUMNS)
+    X, y = df[features], df[TARGET_COLUMN]
+    return {_comparison_key(features, n_splits): _cached_comparison(version, tuple(features), n_splits, X, y)}
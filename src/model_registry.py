@@ -0,0 +1,234 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.data_loader import CACHE_DIR, DATA_PATH, load_data
+from src.derived_features import DERIVED_FEATURES
+from src.forest_inference import compile_pipeline
+
+# --- Cấu hình registry ---
+MODEL_DIR = os.path.join(CACHE_DIR, "models")
+MAX_MODELS_IN_MEMORY = int(os.environ.get("DASHBOARD_MAX_MODELS", 8))
+# Tham số thắng của các lần tinh chỉnh, theo (loại mô hình, dữ liệu huấn luyện)
+TUNED_PATH = os.path.join(MODEL_DIR, "tuned.json")
+
+MODEL_FACTORIES = {
+    "Linear Regression": LinearRegression,
+    "Random Forest": RandomForestRegressor,
+}
+DEFAULT_PARAMS = {
+    "Linear Regression": {},
+    "Random Forest": {"random_state": 42, "n_estimators": 200},
+}
+
+FEATURE_COLUMNS = ["Daily_Screen_Timehrs", "Sleep_Quality1_10", "Stress_Level1_10", "Exercise_Frequencyweek"]
+TARGET_COLUMN = "Happiness_Index1_10"
+
+# Ngưỡng phân loại mức hạnh phúc dự đoán: < 5 cảnh báo, < 7 trung bình, còn lại cao
+BAND_THRESHOLDS = (5, 7)
+BANDS = ("warning", "info", "success")
+
+# Forest đã biên dịch chạy trên một core: nhanh hơn predict của sklearn (joblib, n_jobs=-1)
+# với lô nhỏ, chậm hơn với lô lớn -> chỉ dùng tới số dòng này (đo bằng
+# ``python -m src.benchmark inference``; 64 dòng vẫn nhanh hơn ~3.7 lần trên một core)
+COMPILED_MAX_ROWS = 64
+
+# Cache LRU trong tiến trình, dùng chung cho mọi session
+_pipelines = OrderedDict()
+_lock = threading.Lock()
+# Forest đã biên dịch của từng pipeline (None nếu không phải Random Forest), mất theo pipeline
+_compiled = weakref.WeakKeyDictionary()
+
+
+def data_fingerprint(X, y):
+    """Băm nội dung X, y (kể cả tên cột) để nhận diện dữ liệu huấn luyện."""
+    digest = hashlib.sha1()
+    digest.update(json.dumps(list(map(str, X.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(pd.Series(y), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def pipeline_key(model_type, params, fingerprint):
+    payload = json.dumps({"model": model_type, "params": params, "data": fingerprint}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def build_pipeline(model_type, params=None, n_jobs=None):
+    params = DEFAULT_PARAMS[model_type] if params is None else params
+    model = MODEL_FACTORIES[model_type](**params)
+    # n_jobs không ảnh hưởng kết quả nên không nằm trong khóa cache
+    if n_jobs is not None and "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    return Pipeline([
+        ("scaler", StandardScaler()),
+        ("model", model),
+    ])
+
+
+def _remember(key, pipeline):
+    _pipelines[key] = pipeline
+    _pipelines.move_to_end(key)
+    while len(_pipelines) > MAX_MODELS_IN_MEMORY:
+        _pipelines.popitem(last=False)
+
+
+def _model_path(key):
+    return os.path.join(MODEL_DIR, f"{key}.joblib")
+
+
+def load_pipeline(key):
+    """Lấy pipeline đã huấn luyện theo khóa (bộ nhớ -> đĩa), trả về None nếu chưa có."""
+    with _lock:
+        if key in _pipelines:
+            _pipelines.move_to_end(key)
+            return _pipelines[key]
+    path = _model_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        pipeline = joblib.load(path)
+    except Exception:
+        # File hỏng hoặc khác phiên bản sklearn -> coi như chưa có; session/tiến trình
+        # khác có thể đã xóa (hoặc đang thay) file này cùng lúc
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        return None
+    with _lock:
+        _remember(key, pipeline)
+    return pipeline
+
+
+def save_pipeline(key, pipeline):
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    tmp_path = f"{_model_path(key)}.{os.getpid()}.tmp"
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, _model_path(key))
+    with _lock:
+        _remember(key, pipeline)
+
+
+def get_pipeline(model_type, X, y, params=None, n_jobs=None, fingerprint=None):
+    """Trả về pipeline scaler+model đã fit trên (X, y), chỉ huấn luyện khi chưa có trong cache."""
+    params = DEFAULT_PARAMS[model_type] if params is None else params
+    key = pipeline_key(model_type, params, fingerprint or data_fingerprint(X, y))
+    pipeline = load_pipeline(key)
+    if pipeline is None:
+        pipeline = build_pipeline(model_type, params, n_jobs).fit(X, y)
+        save_pipeline(key, pipeline)
+    return pipeline
+
+
+def get_predictor(pipeline, n_rows=1):
+    """Đối tượng ``predict`` nhanh nhất cho lô ``n_rows`` dòng, cùng kết quả với ``pipeline.predict``.
+
+    Random Forest với lô tới ``COMPILED_MAX_ROWS`` dòng được biên dịch một lần thành mảng
+    nút NumPy (src.forest_inference); lô lớn hơn và các mô hình khác dùng chính pipeline.
+    """
+    if n_rows > COMPILED_MAX_ROWS:
+        return pipeline
+    with _lock:
+        if pipeline in _compiled:
+            return _compiled[pipeline] or pipeline
+    compiled = compile_pipeline(pipeline)
+    with _lock:
+        _compiled[pipeline] = compiled
+    return compiled or pipeline
+
+
+def _read_tuned():
+    try:
+        with open(TUNED_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_tuned(model_type, fingerprint, pipeline, params, features, info=None):
+    """Lưu pipeline thắng của lần tinh chỉnh và đánh dấu nó là mô hình dùng cho dữ liệu này.
+
+    Pipeline được lưu dưới đúng khóa mà ``get_pipeline(model_type, X, y, params)`` sẽ tính,
+    nên trang ML và batch job lấy thẳng từ registry, không huấn luyện lại.
+    """
+    save_pipeline(pipeline_key(model_type, params, fingerprint), pipeline)
+    with _lock:
+        tuned = _read_tuned()
+        tuned[f"{model_type}:{fingerprint}"] = {
+            "model": model_type, "fingerprint": fingerprint, "params": params,
+            "features": list(features), "created": time.time(), **(info or {}),
+        }
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        tmp_path = f"{TUNED_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(tuned, f, indent=2, default=str)
+        os.replace(tmp_path, TUNED_PATH)
+
+
+def tuned_info(model_type, fingerprint):
+    """Kết quả tinh chỉnh cho (loại mô hình, dữ liệu huấn luyện), None nếu chưa tinh chỉnh."""
+    return _read_tuned().get(f"{model_type}:{fingerprint}")
+
+
+def target_dependent(features):
+    """Các đặc trưng cần ``TARGET_COLUMN`` để tính (chính nhãn hoặc đặc trưng dẫn xuất từ nó).
+
+    Dữ liệu cần chấm điểm không có nhãn, nên mô hình dùng các đặc trưng này chỉ chạy
+    được trên trang ML (và bị rò rỉ nhãn), không dùng được cho batch scoring.
+    """
+    derived = {f.name: f for f in DERIVED_FEATURES}
+    return [name for name in features
+            if name == TARGET_COLUMN or (name in derived and TARGET_COLUMN in derived[name].inputs)]
+
+
+def latest_tuned(model_type):
+    """Lần tinh chỉnh gần nhất dùng được khi không có nhãn (bỏ qua tập đặc trưng phụ thuộc nhãn)."""
+    entries = [e for e in _read_tuned().values()
+               if e["model"] == model_type and not target_dependent(e["features"])]
+    return max(entries, key=lambda e: e["created"]) if entries else None
+
+
+def happiness_band(predictions):
+    """Gán nhãn warning/info/success cho (mảng) giá trị Happiness dự đoán."""
+    low, mid = BAND_THRESHOLDS
+    predictions = np.asarray(predictions)
+    bands = np.select([predictions < low, predictions < mid], BANDS[:2], BANDS[2])
+    return bands if bands.ndim else str(bands)
+
+
+def training_split(df, features=None):
+    """Chia train/test 80/20 dùng chung cho trang Machine Learning và các job batch."""
+    X = df[features or FEATURE_COLUMNS]
+    y = df[TARGET_COLUMN]
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+
+def get_default_pipeline(model_type, path=DATA_PATH):
+    """Pipeline giống hệt mô hình trên trang Machine Learning (cùng dữ liệu, cùng phép chia).
+
+    Nếu đã tinh chỉnh mô hình này thì dùng tham số (và đặc trưng) của lần tinh chỉnh gần nhất,
+    miễn là dữ liệu huấn luyện không đổi và các đặc trưng không được tính từ nhãn (xem
+    ``target_dependent``); không thì dùng ``FEATURE_COLUMNS``.
+    """
+    df = load_data(path)
+    latest = latest_tuned(model_type)
+    if latest and set(latest["features"]) <= set(df.columns):
+        X_train, _, y_train, _ = training_split(df, latest["features"])
+        fingerprint = data_fingerprint(X_train, y_train)
+        if fingerprint == latest["fingerprint"]:
+            return get_pipeline(model_type, X_train, y_train, latest["params"], n_jobs=-1, fingerprint=fingerprint)
+    X_train, _, y_train, _ = training_split(df)
+    return get_pipeline(model_type, X_train, y_train, n_jobs=-1)
@@ -0,0 +1,230 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+class OLSAccumulator:
+    """Thống kê đủ (X'X, X'y, y'y, n) cho hồi quy OLS, cộng dồn theo khối và gộp được.
+
+    Mỗi khối chỉ cần một lượt đọc; kết quả ``fit()`` trùng với ``sm.OLS`` trên toàn
+    bộ dữ liệu (các dòng có NaN bị loại, giống ``missing="drop"``).
+    """
+
+    def __init__(self, x_cols, y_col, add_constant=True):
+        self.x_cols = list(x_cols)
+        self.y_col = y_col
+        self.add_constant = add_constant
+        k = len(self.names)
+        self.xtx = np.zeros((k, k))
+        self.xty = np.zeros(k)
+        self.yty = 0.0
+        self.y_sum = 0.0
+        self.n = 0
+
+    @property
+    def names(self):
+        return (["const"] if self.add_constant else []) + self.x_cols
+
+    def _design(self, df):
+        values = df[self.x_cols + [self.y_col]].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values).any(axis=1)]
+        X, y = values[:, :-1], values[:, -1]
+        if self.add_constant:
+            X = np.column_stack([np.ones(len(X)), X])
+        return X, y
+
+    def update(self, df):
+        X, y = self._design(df)
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.yty += y @ y
+        self.y_sum += y.sum()
+        self.n += len(y)
+        return self
+
+    def merge(self, other):
+        self.xtx = self.xtx + other.xtx
+        self.xty = self.xty + other.xty
+        self.yty += other.yty
+        self.y_sum += other.y_sum
+        self.n += other.n
+        return self
+
+    def fit(self):
+        return OLSResult(self)
+
+
+class OLSResult:
+    """Kết quả hồi quy với các thuộc tính cùng tên như ``RegressionResults`` của statsmodels."""
+
+    def __init__(self, acc):
+        self.exog_names = acc.names
+        self.endog_name = acc.y_col
+        # Dùng số thực numpy để nhóm quá nhỏ cho ra NaN/inf thay vì ZeroDivisionError
+        self.nobs = np.float64(acc.n)
+        k = len(self.exog_names)
+        self.df_model = np.float64(k - 1 if acc.add_constant else k)
+        self.df_resid = self.nobs - k
+
+        xtx_inv = np.linalg.pinv(acc.xtx)
+        beta = xtx_inv @ acc.xty
+        # SSR = y'y - 2β'X'y + β'X'Xβ (không cần giữ lại phần dư)
+        self.ssr = np.float64(max(acc.yty - 2 * beta @ acc.xty + beta @ acc.xtx @ beta, 0.0))
+        if acc.add_constant:
+            self.centered_tss = np.float64(acc.yty - acc.y_sum ** 2 / acc.n) if acc.n else np.nan
+        else:
+            self.centered_tss = np.float64(acc.yty)
+        self.ess = self.centered_tss - self.ssr
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.rsquared = 1 - self.ssr / self.centered_tss
+            self.rsquared_adj = 1 - (self.nobs - acc.add_constant) / self.df_resid * (1 - self.rsquared)
+            self.mse_resid = self.ssr / self.df_resid
+            self.fvalue = (self.ess / self.df_model) / self.mse_resid
+            bse = np.sqrt(np.diag(xtx_inv) * self.mse_resid)
+            self.llf = -self.nobs / 2 * (np.log(2 * np.pi) + np.log(self.ssr / self.nobs) + 1)
+        self.f_pvalue = stats.f.sf(self.fvalue, self.df_model, self.df_resid)
+        self.aic = -2 * self.llf + 2 * k
+        self.bic = -2 * self.llf + np.log(self.nobs) * k
+
+        self.params = pd.Series(beta, index=self.exog_names)
+        self.bse = pd.Series(bse, index=self.exog_names)
+        self.tvalues = self.params / self.bse
+        self.pvalues = pd.Series(2 * stats.t.sf(np.abs(self.tvalues), self.df_resid), index=self.exog_names)
+        self.cov_params_ = pd.DataFrame(xtx_inv * self.mse_resid, index=self.exog_names, columns=self.exog_names)
+
+    def cov_params(self):
+        return self.cov_params_
+
+    def conf_int(self, alpha=0.05):
+        q = stats.t.ppf(1 - alpha / 2, self.df_resid)
+        return pd.DataFrame({0: self.params - q * self.bse, 1: self.params + q * self.bse})
+
+    def predict(self, exog):
+        exog = np.asarray(exog, dtype=np.float64)
+        return exog @ self.params.to_numpy()
+
+    def summary(self, title="OLS Regression Results", alpha=0.05):
+        """Bảng tóm tắt theo định dạng ``OLSResults.summary()`` của statsmodels."""
+        from statsmodels.iolib.summary import Summary
+
+        top_left = [
+            ("Dep. Variable:", [self.endog_name]),
+            ("Model:", ["OLS"]),
+            ("Method:", ["Least Squares"]),
+            ("Date:", None),
+            ("Time:", None),
+            ("No. Observations:", None),
+            ("Df Residuals:", None),
+            ("Df Model:", None),
+            ("Covariance Type:", ["nonrobust"]),
+        ]
+        top_right = [
+            ("R-squared:", [f"{self.rsquared:#8.3f}"]),
+            ("Adj. R-squared:", [f"{self.rsquared_adj:#8.3f}"]),
+            ("F-statistic:", [f"{self.fvalue:#8.4g}"]),
+            ("Prob (F-statistic):", [f"{self.f_pvalue:#6.3g}"]),
+            ("Log-Likelihood:", None),
+            ("AIC:", [f"{self.aic:#8.4g}"]),
+            ("BIC:", [f"{self.bic:#8.4g}"]),
+        ]
+        smry = Summary()
+        smry.add_table_2cols(self, gleft=top_left, gright=top_right,
+                             yname=self.endog_name, xname=self.exog_names, title=title)
+        smry.add_table_params(self, yname=self.endog_name, xname=self.exog_names, alpha=alpha, use_t=True)
+        return smry
+
+    def summary_frame(self, alpha=0.05):
+        ci = self.conf_int(alpha)
+        return pd.DataFrame({
+            "coef": self.params, "std err": self.bse, "t": self.tvalues, "P>|t|": self.pvalues,
+            f"[{alpha / 2}": ci[0], f"{1 - alpha / 2}]": ci[1],
+        })
+
+
+class GroupedOLSAccumulator:
+    """Nhiều hồi quy OLS (một cho mỗi nhóm) trong cùng một lượt đọc dữ liệu."""
+
+    def __init__(self, x_cols, y_col, by, add_constant=True):
+        self.x_cols = list(x_cols)
+        self.y_col = y_col
+        self.by = by
+        self.add_constant = add_constant
+        self.groups = {}
+
+    def update(self, df):
+        # Tính tích từng cặp cột cho mọi dòng, rồi cộng theo nhóm bằng một lần groupby
+        values = df[self.x_cols + [self.y_col]].to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = ~np.isnan(values).any(axis=1)
+        X, y = values[ok, :-1], values[ok, -1]
+        if self.add_constant:
+            X = np.column_stack([np.ones(len(X)), X])
+        n, k = X.shape
+        products = np.column_stack([
+            (X[:, :, None] * X[:, None, :]).reshape(n, k * k), X * y[:, None], y * y, y, np.ones(n)
+        ])
+        keys = df[self.by].to_numpy()[ok]
+        sums = pd.DataFrame(products).groupby(keys).sum()
+
+        for key, row in zip(sums.index, sums.to_numpy()):
+            part = OLSAccumulator(self.x_cols, self.y_col, self.add_constant)
+            part.xtx = row[:k * k].reshape(k, k)
+            part.xty = row[k * k:k * k + k]
+            part.yty, part.y_sum, part.n = row[-3], row[-2], int(row[-1])
+            if key in self.groups:
+                self.groups[key].merge(part)
+            else:
+                self.groups[key] = part
+        return self
+
+    def merge(self, other):
+        for key, part in other.groups.items():
+            if key in self.groups:
+                self.groups[key].merge(part)
+            else:
+                self.groups[key] = part
+        return self
+
+    def total(self):
+        """Hồi quy gộp từ các nhóm.
+
+        Dòng thiếu giá trị ở cột nhóm không thuộc nhóm nào nên không có ở đây; cần hồi quy
+        trên toàn bộ dữ liệu thì cộng dồn thêm một ``OLSAccumulator``.
+        """
+        acc = OLSAccumulator(self.x_cols, self.y_col, self.add_constant)
+        for part in self.groups.values():
+            acc.merge(part)
+        return acc
+
+    def fit(self):
+        return {key: part.fit() for key, part in self.groups.items()}
+
+
+def fit_ols(chunks, x_cols, y_col, add_constant=True):
+    """Fit OLS trên iterable các DataFrame (ví dụ ``[df]`` hoặc ``read_chunks(path)``)."""
+    acc = OLSAccumulator(x_cols, y_col, add_constant)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.fit()
+
+
+def fit_grouped_ols(chunks, x_cols, y_col, by, add_constant=True):
+    acc = GroupedOLSAccumulator(x_cols, y_col, by, add_constant)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.fit()
+
+
+def coefficients_table(results):
+    """Bảng hệ số (intercept, slope, R², n) cho dict {nhóm: OLSResult} của hồi quy một biến."""
+    rows = []
+    for key, res in results.items():
+        rows.append({
+            "Nhóm": key,
+            "Intercept": res.params.iloc[0],
+            "Slope": res.params.iloc[-1],
+            "p-value (slope)": res.pvalues.iloc[-1],
+            "R²": res.rsquared,
+            "n": int(res.nobs),
+        })
+    return pd.DataFrame(rows)
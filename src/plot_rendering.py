@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from src.ols_engine import fit_grouped_ols, fit_ols
+
+# --- Ngưỡng chuyển sang chế độ dữ liệu lớn ---
+ROW_THRESHOLD = int(os.environ.get("DASHBOARD_PLOT_ROW_THRESHOLD", 20_000))
+MAX_POINTS = int(os.environ.get("DASHBOARD_PLOT_MAX_POINTS", 10_000))
+DENSITY_BINS = 80
+# Tỷ lệ tối đa của mẫu dành cho các điểm ngoại lai
+OUTLIER_SHARE = 0.2
+
+
+def downsample(df, n=MAX_POINTS, by=None, outlier_cols=None, seed=42):
+    """Lấy mẫu phân tầng theo ``by`` (giữ tỷ lệ từng nhóm) và giữ lại các điểm ngoại lai."""
+    if len(df) <= n:
+        return df
+    rng = np.random.default_rng(seed)
+
+    keep = np.zeros(len(df), dtype=bool)
+    if outlier_cols:
+        values = df[outlier_cols].to_numpy(dtype=np.float64)
+        lo, hi = np.nanquantile(values, [0.005, 0.995], axis=0)
+        outliers = np.flatnonzero(((values < lo) | (values > hi)).any(axis=1))
+        budget = int(n * OUTLIER_SHARE)
+        if len(outliers) > budget:
+            outliers = rng.choice(outliers, budget, replace=False)
+        keep[outliers] = True
+
+    remaining = n - keep.sum()
+    candidates = np.flatnonzero(~keep)
+    if by is None:
+        keep[rng.choice(candidates, min(remaining, len(candidates)), replace=False)] = True
+    else:
+        groups = df[by].to_numpy()[candidates]
+        labels, codes = np.unique(groups.astype(str), return_inverse=True)
+        for g in range(len(labels)):
+            members = candidates[codes == g]
+            take = max(1, int(round(remaining * len(members) / len(candidates))))
+            keep[rng.choice(members, min(take, len(members)), replace=False)] = True
+    return df[keep]
+
+
+def trendline_fits(df, x, y, color=None):
+    """Hệ số OLS y ~ x cho toàn bộ dữ liệu hoặc từng nhóm màu, trong một lượt tính."""
+    if color is None:
+        return {None: fit_ols([df], [x], y)}
+    return fit_grouped_ols([df], [x], y, color)
+
+
+def add_trendlines(fig, df, x, y, color=None, coefs=None):
+    """Thêm đường OLS tính trên server (trên toàn bộ dữ liệu, theo từng nhóm màu).
+
+    ``coefs`` là (intercept, slope) đã có sẵn, ví dụ từ mô hình hồi quy của trang,
+    để không phải fit lại.
+    """
+    if coefs is not None:
+        lines = {None: coefs}
+    else:
+        lines = {
+            name: (res.params.iloc[0], res.params.iloc[1])
+            for name, res in trendline_fits(df, x, y, color).items() if res.nobs >= 2
+        }
+    trace_colors = {trace.name: getattr(getattr(trace, "marker", None), "color", None) for trace in fig.data}
+    x_min, x_max = df[x].min(), df[x].max()
+    for name, (intercept, slope) in lines.items():
+        if not np.isfinite(slope):
+            continue
+        label = "OLS" if name is None else str(name)
+        fig.add_trace(go.Scatter(
+            x=[x_min, x_max], y=[intercept + slope * x_min, intercept + slope * x_max],
+            mode="lines", name=f"OLS ({label})" if name is not None else "OLS",
+            legendgroup=label, showlegend=False,
+            line=dict(color=trace_colors.get(label)),
+            hovertemplate=f"{y} = {intercept:.3f} + {slope:.3f} × {x}<extra></extra>",
+        ))
+    return fig
+
+
+def density_heatmap(df, x, y, bins=DENSITY_BINS, title=None):
+    """Lưới mật độ 2D tính sẵn trên server (chỉ gửi bins×bins ô xuống trình duyệt)."""
+    counts, x_edges, y_edges = np.histogram2d(
+        df[x].to_numpy(dtype=np.float64), df[y].to_numpy(dtype=np.float64), bins=bins
+    )
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=np.where(counts.T > 0, counts.T, np.nan), colorscale="Viridis", colorbar=dict(title="Số dòng"),
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+def _sampled_title(title, shown, total):
+    suffix = f"(mẫu {shown:,}/{total:,} điểm)"
+    return f"{title} {suffix}" if title else suffix
+
+
+def scatter(df, x, y, color=None, trendline=False, large="sample", title=None, **kwargs):
+    """``px.scatter`` cho mọi kích thước dữ liệu.
+
+    Dưới ``ROW_THRESHOLD`` dòng: vẽ đủ điểm. Trên ngưỡng: ``large="sample"`` lấy mẫu
+    phân tầng (giữ ngoại lai) với WebGL, ``large="density"`` vẽ lưới mật độ 2D.
+    Đường xu hướng (``trendline=True`` hoặc cặp (intercept, slope) có sẵn) luôn được
+    tính trên server với toàn bộ dữ liệu.
+    """
+    big = len(df) > ROW_THRESHOLD
+    if big and large == "density":
+        fig = density_heatmap(df, x, y, title=title)
+    else:
+        shown = downsample(df, by=color, outlier_cols=[x, y]) if big else df
+        fig = px.scatter(shown, x=x, y=y, color=color, title=title,
+                         render_mode="webgl" if big else "auto", **kwargs)
+        if big:
+            fig.update_layout(title=_sampled_title(title, len(shown), len(df)))
+    if trendline is not False and trendline is not None:
+        coefs = None if trendline is True else trendline
+        add_trendlines(fig, df, x, y, None if big and large == "density" else color, coefs)
+    return fig
+
+
+def scatter_3d(df, x, y, z, color=None, title=None, **kwargs):
+    """``px.scatter_3d`` với lấy mẫu phân tầng khi dữ liệu vượt ngưỡng (3D luôn dùng WebGL)."""
+    shown = downsample(df, by=color, outlier_cols=[x, y, z]) if len(df) > ROW_THRESHOLD else df
+    fig = px.scatter_3d(shown, x=x, y=y, z=z, color=color, title=title, **kwargs)
+    if len(shown) < len(df):
+        fig.update_layout(title=_sampled_title(title, len(shown), len(df)))
+    return fig
+
+
+def histogram(df, x, color=None, nbins=20, title=None, **kwargs):
+    """Histogram; trên ngưỡng thì đếm theo bin trên server và chỉ gửi số đếm."""
+    if len(df) <= ROW_THRESHOLD:
+        return px.histogram(df, x=x, color=color, nbins=nbins, title=title, **kwargs)
+    edges = np.histogram_bin_edges(df[x].dropna().to_numpy(dtype=np.float64), bins=nbins)
+    groups = [(None, df)] if color is None else df.groupby(color, observed=True, sort=False)
+    frames = []
+    for name, group in groups:
+        counts, _ = np.histogram(group[x].to_numpy(dtype=np.float64), bins=edges)
+        frames.append(pd.DataFrame({x: (edges[:-1] + edges[1:]) / 2, "count": counts, "group": name}))
+    binned = pd.concat(frames, ignore_index=True)
+    fig = px.bar(binned, x=x, y="count", color="group" if color else None, title=title,
+                 labels={"group": color}, **kwargs)
+    fig.update_layout(bargap=0)
+    return fig
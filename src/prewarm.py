@@ -0,0 +1,42 @@
+import importlib
+import os
+import threading
+
+from src.data_loader import DATA_PATH, load_data
+
+# Bật bằng DASHBOARD_PREWARM=1: import các trang nặng trong nền sau khi sidebar đã hiển thị
+PREWARM = os.environ.get("DASHBOARD_PREWARM", "0") == "1"
+PAGE_MODULES = ["src.eda_visualization", "src.regression_analysis", "src.ml_model"]
+
+_started = False
+_lock = threading.Lock()
+
+
+def _prewarm(modules):
+    # Lỗi ở đây không được làm hỏng app: trang sẽ tự import (và báo lỗi) khi được chọn
+    try:
+        load_data(DATA_PATH)
+    except OSError:
+        pass
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def start_prewarm(enabled=PREWARM, modules=None):
+    """Chạy prewarm đúng một lần mỗi tiến trình trên thread nền (daemon).
+
+    Lượt chạy đầu tiên không phải chờ: menu và trang tĩnh hiển thị ngay, trong khi
+    dataset và các module trang được nạp sẵn cho lần người dùng chuyển trang.
+    """
+    global _started
+    if not enabled:
+        return False
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    threading.Thread(target=_prewarm, args=(modules or PAGE_MODULES,), name="dashboard-prewarm", daemon=True).start()
+    return True
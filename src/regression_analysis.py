@@ -1,35 +1,95 @@
+import os
 import streamlit as st
-import statsmodels.api as sm
-import plotly.express as px
-from src.data_loader import load_data
+from src.artifacts import fetch
+from src.data_loader import DATA_PATH, dataset_version, load_data
+from src.instrumentation import span, timed
+from src.ols_engine import GroupedOLSAccumulator, OLSAccumulator, coefficients_table
+from src.plot_rendering import scatter
+from src.streaming_stats import DEFAULT_CHUNKSIZE, SAMPLE_SIZE, ReservoirSample, read_chunks, should_stream
 
-def show_regression_analysis():
-    st.title("📈 Phân tích hồi quy – Mối liên hệ giữa Screen Time và Stress")
+X_COL = "Daily_Screen_Timehrs"
+Y_COL = "Stress_Level1_10"
+GROUP_COLUMNS = ["Social_Media_Platform", "Gender"]
 
-    df = load_data("data/Mental_Health_and_Social_Media_Balance_Dataset.csv")
 
-    # Biến độc lập và phụ thuộc
-    X = sm.add_constant(df["Daily_Screen_Timehrs"])
-    y = df["Stress_Level1_10"]
+@timed("regression.fit_ols")
+@st.cache_resource(show_spinner="Đang ước lượng hồi quy...", max_entries=4)
+def _fit_regressions(path, mtime, streaming, chunksize):
+    # Một lượt đọc dữ liệu: cộng dồn X'X, X'y, y'y cho toàn bộ dữ liệu và theo từng nền
+    # tảng, giới tính (hồi quy tổng giữ cả dòng thiếu nền tảng/giới tính). Kết quả (mô hình + dữ liệu vẽ) dùng chung
+    # cho mọi session, không sao chép dataset mỗi lần đọc cache; chỉ đọc
+    chunks = read_chunks(path, chunksize) if streaming else [load_data(path)]
+    total = OLSAccumulator([X_COL], Y_COL)
+    grouped = {by: GroupedOLSAccumulator([X_COL], Y_COL, by) for by in GROUP_COLUMNS}
+    sample = ReservoirSample(SAMPLE_SIZE) if streaming else None
+    df = None
+    for chunk in chunks:
+        total.update(chunk)
+        for acc in grouped.values():
+            acc.update(chunk)
+        if streaming:
+            sample.update(chunk)
+        else:
+            df = chunk
 
-    model = sm.OLS(y, X).fit()
+    return {
+        "model": total.fit(),
+        "groups": {by: acc.fit() for by, acc in grouped.items()},
+        "data": sample.result() if streaming else df,
+    }
 
-    st.subheader("📘 Kết quả hồi quy tuyến tính")
-    st.write(model.summary())
 
-    # Hiển thị biểu đồ scatter + đường hồi quy
-    fig = px.scatter(df, x="Daily_Screen_Timehrs", y="Stress_Level1_10", trendline="ols",
-                     title="Ảnh hưởng của thời gian dùng mạng xã hội đến mức độ stress")
-    st.plotly_chart(fig, use_container_width=True)
+def _page_artifacts(path):
+    # Mọi thứ trang cần: mô hình, hồi quy theo nhóm, bảng summary() và biểu đồ scatter
+    fitted = _fit_regressions(path, os.path.getmtime(path), should_stream(path), DEFAULT_CHUNKSIZE)
+    model = fitted["model"]
+    with span("regression.summary") as s:
+        s.payload = summary = model.summary()
+    # Biểu đồ scatter + đường hồi quy (dùng lại hệ số của mô hình ở trên)
+    intercept, slope = model.params.iloc[0], model.params.iloc[1]
+    with span("regression.scatter") as s:
+        s.payload = fig = scatter(fitted["data"], x=X_COL, y=Y_COL, trendline=(intercept, slope), large="density",
+                                  title="Ảnh hưởng của thời gian dùng mạng xã hội đến mức độ stress")
+    return {"model": model, "groups": fitted["groups"], "summary": summary, "scatter": fig}
+
+
+def show_regression_analysis():
+    st.title("📈 Phân tích hồi quy – Mối liên hệ giữa Screen Time và Stress")
+
+    # Lấy từ bundle dựng sẵn (python -m src.artifacts) nếu có, không thì ước lượng trực tiếp
+    fitted = fetch(dataset_version(DATA_PATH), "regression/page", lambda: _page_artifacts(DATA_PATH))
+    model = fitted["model"]
+
+    st.subheader("📘 Kết quả hồi quy tuyến tính")
+    st.write(fitted["summary"])
 
     # Tóm tắt phương trình
-    intercept = model.params[0]
-    slope = model.params[1]
+    intercept = model.params.iloc[0]
+    slope = model.params.iloc[1]
     r2 = model.rsquared
 
+    st.plotly_chart(fitted["scatter"], use_container_width=True)
+
     st.markdown(f"""
     ### 🔍 Phương trình hồi quy:
     **Stress = {intercept:.2f} + {slope:.2f} × Screen_Time**
-    
+
     ### 📊 Hệ số tương quan (R²): {r2:.3f}
     """)
+
+    # Hồi quy riêng cho từng nhóm (đã tính trong cùng lượt đọc dữ liệu)
+    st.subheader("🧩 Hồi quy theo nhóm")
+    col1, col2 = st.columns(2)
+    for col, by, label in zip((col1, col2), GROUP_COLUMNS, ("nền tảng", "giới tính")):
+        col.markdown(f"**Theo {label}**")
+        col.dataframe(coefficients_table(fitted["groups"][by]).round(3), hide_index=True)
+
+
+# --- Dựng sẵn artifact (python -m src.artifacts) ---
+def precompute_tasks(path, age_ranges):
+    """Job dựng sẵn artifact của trang (không phụ thuộc bộ lọc)."""
+    return [(precompute_page, (path,))]
+
+
+def precompute_page(path):
+    return {"regression/page": _page_artifacts(path)}
@@ -0,0 +1,135 @@
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+from src.data_loader import extends_version
+
+DEFAULT_FEATURES = ["Daily_Screen_Timehrs", "Sleep_Quality1_10", "Stress_Level1_10", "Happiness_Index1_10"]
+
+
+class UserSegmentation:
+    """Phân nhóm người dùng bằng MiniBatchKMeans, cập nhật tăng dần khi có dòng mới.
+
+    Lần đầu fit trên toàn bộ dữ liệu; các lần sau chỉ ``partial_fit`` trên phần
+    dòng được thêm vào, nên chi phí tỷ lệ với dữ liệu mới. Khi biết phiên bản dataset,
+    dữ liệu chỉ được nối thêm hay bị thay thế được suy ra từ phiên bản (không đọc lại các
+    dòng cũ); nếu không, các dòng đã học được so bằng hash của từng khối: khối nào đổi giá
+    trị thì fit lại từ đầu. Nhãn được đánh số
+    theo thứ tự tăng dần của ``order_by`` trong centroid (mặc định Happiness) và
+    giữ nguyên qua các lần cập nhật; nhãn của các dòng cũ không bị tính lại.
+    """
+
+    def __init__(self, n_clusters=3, features=None, order_by="Happiness_Index1_10",
+                 batch_size=1024, random_state=42):
+        self.n_clusters = n_clusters
+        self.features = list(features or DEFAULT_FEATURES)
+        self.order_by = order_by if order_by in self.features else self.features[0]
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.model = None
+        self.labels_ = np.empty(0, dtype=np.int64)
+        self._label_map = None
+        # Hash giá trị của từng khối dòng đã học (fit, rồi mỗi lần partial_fit), theo thứ tự
+        self._blocks = []
+        # Phiên bản dataset (``dataset_version``) của các dòng đã học, nếu người gọi cung cấp
+        self._version = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Lock không pickle được (bundle artifact, process pool) -> tạo lại khi nạp
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        # Bản pickle cũ không có hash các khối -> coi như dữ liệu đã đổi, fit lại lần đầu
+        state.setdefault("_blocks", None)
+        state.setdefault("_version", None)
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def n_seen(self):
+        return len(self.labels_)
+
+    def _values(self, df):
+        return df[self.features].to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _digest(values):
+        return hashlib.sha1(np.ascontiguousarray(values)).hexdigest()
+
+    def _prefix_unchanged(self, values):
+        # Các dòng đã học còn nguyên giá trị? (số dòng bằng nhau nhưng nội dung khác = bị thay thế)
+        if self._blocks is None:
+            return False
+        start = 0
+        for n_rows, digest in self._blocks:
+            if self._digest(values[start:start + n_rows]) != digest:
+                return False
+            start += n_rows
+        return True
+
+    def fit(self, df):
+        values = self._values(df)
+        self.model = MiniBatchKMeans(
+            n_clusters=self.n_clusters, batch_size=self.batch_size,
+            random_state=self.random_state, n_init=3,
+        ).fit(values)
+        self._blocks = [(len(values), self._digest(values))]
+        # Sau lần fit đầu không cho phép gán lại tâm cụm -> chỉ số cụm nội bộ ổn định
+        self.model.set_params(reassignment_ratio=0.0)
+
+        order = np.argsort(self.model.cluster_centers_[:, self.features.index(self.order_by)])
+        self._label_map = np.empty(self.n_clusters, dtype=np.int64)
+        self._label_map[order] = np.arange(self.n_clusters)
+        self.labels_ = self._label_map[self.model.labels_]
+        return self
+
+    def partial_fit(self, new_rows):
+        if self.model is None:
+            return self.fit(new_rows)
+        values = self._values(new_rows)
+        if len(values):
+            self.model.partial_fit(values)
+            self.labels_ = np.concatenate([self.labels_, self.predict(new_rows)])
+            if self._blocks is not None:
+                self._blocks.append((len(values), self._digest(values)))
+        return self
+
+    def _is_append(self, df, version):
+        # ``df`` = các dòng đã học + dòng mới ở cuối?
+        if self.model is None or len(df) < self.n_seen:
+            return False
+        if version is not None and self._version is not None:
+            # So phiên bản: O(1), không băm lại lịch sử
+            return extends_version(self._version, version)
+        return self._prefix_unchanged(self._values(df.iloc[:self.n_seen]))
+
+    def update(self, df, version=None):
+        """Đồng bộ với ``df``: chỉ xử lý các dòng nối thêm, fit lại nếu dữ liệu bị thay thế.
+
+        ``version`` là ``dataset_version`` của đúng các dòng trong ``df`` (không truyền cho
+        mẫu ngẫu nhiên hay dữ liệu đã lọc). Có ``version`` thì chỉ ``partial_fit`` khi phiên
+        bản mới là phiên bản đã học cộng thêm dòng ở cuối; không có thì khi ``n_seen`` dòng
+        đầu của ``df`` giữ nguyên giá trị đã học.
+        """
+        with self._lock:
+            if not self._is_append(df, version):
+                self.fit(df)
+            elif len(df) > self.n_seen:
+                self.partial_fit(df.iloc[self.n_seen:])
+            self._version = version
+            return self.labels_.copy()
+
+    def predict(self, df):
+        return self._label_map[self.model.predict(self._values(df))]
+
+    @property
+    def centroids(self):
+        centers = np.empty_like(self.model.cluster_centers_)
+        centers[self._label_map] = self.model.cluster_centers_
+        return pd.DataFrame(centers, columns=self.features).rename_axis("Cluster")
@@ -0,0 +1,234 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.covariance_engine import CovarianceCube
+from src.data_loader import normalize_columns, optimize_dtypes
+from src.derived_features import add_derived_features
+
+# --- Cấu hình đọc theo khối ---
+DEFAULT_CHUNKSIZE = int(os.environ.get("DASHBOARD_CHUNKSIZE", 100_000))
+# File lớn hơn ngưỡng này sẽ được xử lý theo chế độ streaming
+STREAMING_THRESHOLD_BYTES = int(os.environ.get("DASHBOARD_STREAMING_THRESHOLD", 200 * 1024 ** 2))
+SAMPLE_SIZE = 20_000
+
+CORR_COLUMNS = ["Sleep_Quality1_10", "Stress_Level1_10", "Daily_Screen_Timehrs", "Happiness_Index1_10"]
+PLATFORM_COLUMNS = ["Happiness_Index1_10", "Stress_Level1_10"]
+
+
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Đọc dataset (CSV hoặc Parquet) thành từng khối DataFrame."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield add_derived_features(optimize_dtypes(normalize_columns(batch.to_pandas())))
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield add_derived_features(optimize_dtypes(normalize_columns(chunk)))
+
+
+def distinct_values(path, column, chunksize=DEFAULT_CHUNKSIZE):
+    """Các giá trị khác nhau (đã sắp xếp) của một cột, chỉ đọc riêng cột đó."""
+    values = set()
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=[column]):
+            values.update(batch.column(0).drop_null().unique().to_pylist())
+    else:
+        for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize):
+            values.update(chunk[column].dropna().unique())
+    return sorted(values)
+
+
+def should_stream(path):
+    return os.path.getsize(path) > STREAMING_THRESHOLD_BYTES
+
+
+class RunningStats:
+    """count/mean/variance/min/max theo từng cột, gộp được giữa các khối (Chan et al.)."""
+
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.count = self.mean = self.m2 = self.min = self.max = None
+
+    def _init(self, columns):
+        k = len(columns)
+        self.columns = list(columns)
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    def update(self, df):
+        if self.count is None:
+            self._init(self.columns or df.select_dtypes("number").columns)
+        values = df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        if not len(values):
+            return self
+        other = RunningStats(self.columns)
+        other.count = np.sum(~np.isnan(values), axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            other.mean = np.nan_to_num(np.nansum(values, axis=0) / other.count)
+        other.m2 = np.nansum((values - other.mean) ** 2, axis=0)
+        other.min = np.nanmin(np.where(np.isnan(values), np.inf, values), axis=0)
+        other.max = np.nanmax(np.where(np.isnan(values), -np.inf, values), axis=0)
+        return self.merge(other)
+
+    def merge(self, other):
+        if other.count is None:
+            return self
+        if self.count is None:
+            self._init(other.columns)
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(n > 0, other.count / n, 0.0)
+        self.mean = self.mean + delta * ratio
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * ratio
+        self.count = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def describe(self):
+        if self.count is None:
+            return pd.DataFrame(columns=["mean", "std", "min", "max"], dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(self.m2 / (self.count - 1))
+        empty = self.count == 0
+        return pd.DataFrame({
+            "mean": np.where(empty, np.nan, self.mean),
+            "std": np.where(self.count > 1, std, np.nan),
+            "min": np.where(empty, np.nan, self.min),
+            "max": np.where(empty, np.nan, self.max),
+        }, index=self.columns)
+
+
+class GroupedMeans:
+    """Trung bình theo nhóm, cộng dồn tổng và số lượng qua các khối."""
+
+    def __init__(self, by, columns):
+        self.by = by
+        self.columns = list(columns)
+        self.sums = None
+        self.counts = None
+
+    def update(self, df):
+        # Ép về float64 để tổng của các cột int8 không bị tràn số
+        values = df[self.columns].astype(np.float64)
+        grouped = values.groupby(df[self.by], observed=True)
+        sums, counts = grouped.sum(), grouped.count()
+        if self.sums is None:
+            self.sums, self.counts = sums, counts
+        else:
+            self.sums = self.sums.add(sums, fill_value=0)
+            self.counts = self.counts.add(counts, fill_value=0)
+        return self
+
+    def merge(self, other):
+        if other.sums is not None:
+            if self.sums is None:
+                self.sums, self.counts = other.sums, other.counts
+            else:
+                self.sums = self.sums.add(other.sums, fill_value=0)
+                self.counts = self.counts.add(other.counts, fill_value=0)
+        return self
+
+    def result(self):
+        if self.sums is None:
+            return pd.DataFrame(columns=[self.by] + self.columns)
+        means = self.sums / self.counts
+        means.index = means.index.astype(str)
+        return means.sort_index().reset_index()
+
+
+class ValueCounts:
+    def __init__(self, column):
+        self.column = column
+        self.counts = pd.Series(dtype=np.int64)
+
+    def update(self, df):
+        counts = df[self.column].value_counts()
+        counts.index = counts.index.astype(str)
+        self.counts = self.counts.add(counts, fill_value=0).astype(np.int64)
+        return self
+
+    def merge(self, other):
+        self.counts = self.counts.add(other.counts, fill_value=0).astype(np.int64)
+        return self
+
+    def result(self):
+        return self.counts[self.counts > 0].sort_values(ascending=False)
+
+
+class ReservoirSample:
+    """Mẫu ngẫu nhiên đều kích thước cố định (bottom-k), dùng để vẽ biểu đồ theo dòng."""
+
+    def __init__(self, size=SAMPLE_SIZE, seed=42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.sample = None
+
+    def update(self, df):
+        df = df.assign(_key=self.rng.random(len(df)))
+        if self.sample is not None:
+            df = pd.concat([self.sample, df], ignore_index=True)
+        self.sample = df.nsmallest(self.size, "_key") if len(df) > self.size else df
+        return self
+
+    def result(self):
+        if self.sample is None:
+            return pd.DataFrame()
+        return self.sample.drop(columns="_key").reset_index(drop=True)
+
+
+def filter_rows(df, age_range=None, platform=None):
+    mask = np.ones(len(df), dtype=bool)
+    if age_range is not None:
+        mask &= (df["Age"] >= age_range[0]).to_numpy() & (df["Age"] <= age_range[1]).to_numpy()
+    if platform is not None:
+        mask &= (df["Social_Media_Platform"] == platform).to_numpy()
+    return df[mask]
+
+
+def compute_eda_tables(chunks, age_range=None, platform=None, sample_size=None):
+    """Tính các bảng thống kê của EDA dashboard trong một lượt đọc.
+
+    ``chunks`` là iterable các DataFrame (ví dụ ``read_chunks(path)`` hoặc
+    ``[df]``). Bộ nhớ chỉ phụ thuộc vào kích thước khối, không vào số dòng.
+    """
+    summary = RunningStats()
+    gender = ValueCounts("Gender")
+    platform_means = GroupedMeans("Social_Media_Platform", PLATFORM_COLUMNS)
+    covariance = CovarianceCube()
+    age_stats = RunningStats(["Age"])
+    sample = ReservoirSample(sample_size) if sample_size else None
+    n_filtered = 0
+
+    for chunk in chunks:
+        filtered = filter_rows(chunk, age_range, platform)
+        n_filtered += len(filtered)
+        summary.update(filtered)
+        gender.update(filtered)
+        platform_means.update(chunk)
+        covariance.update(chunk)
+        age_stats.update(chunk)
+        if sample is not None:
+            sample.update(chunk)
+
+    age = age_stats.describe().loc["Age"]
+    return {
+        "n_filtered": n_filtered,
+        "summary": summary.describe(),
+        "gender_counts": gender.result(),
+        "platform_means": platform_means.result(),
+        "corr": covariance.corr(CORR_COLUMNS),
+        "covariance": covariance,
+        "age_min": age["min"],
+        "age_max": age["max"],
+        "sample": sample.result() if sample is not None else None,
+    }
@@ -0,0 +1,145 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.data_loader import DATA_PATH
+
+# Tên cột gốc của file CSV (trước khi normalize_columns)
+ID_COLUMN = "User_ID"
+CATEGORY_COLUMNS = ["Gender", "Social_Media_Platform"]
+NUMERIC_COLUMNS = [
+    "Age", "Daily_Screen_Time(hrs)", "Sleep_Quality(1-10)", "Stress_Level(1-10)",
+    "Days_Without_Social_Media", "Exercise_Frequency(week)", "Happiness_Index(1-10)",
+]
+DEFAULT_CHUNKSIZE = 1_000_000
+# Khối sinh số ngẫu nhiên nội bộ, căn theo chỉ số dòng tuyệt đối: dòng i luôn lấy từ
+# khối i // BLOCK_ROWS (seed = (seed, số khối)), bất kể kích thước khối ghi ra
+BLOCK_ROWS = 1 << 16
+# Tăng khi đổi cách sinh dữ liệu -> file giả lập đã cache (synthetic_csv) được sinh lại
+GENERATOR_VERSION = 2
+
+
+class SyntheticDataGenerator:
+    """Sinh dữ liệu giả lập cùng schema với dataset gốc, kích thước tùy ý.
+
+    Các cột số dùng Gaussian copula ước lượng từ file tham chiếu: tương quan hạng
+    giữa các cột được giữ nguyên, mỗi cột được ánh xạ ngược qua phân phối thực
+    nghiệm nên chỉ nhận các giá trị đã xuất hiện (điểm nguyên 1–10, screen time
+    một chữ số thập phân...). Giới tính và nền tảng lấy theo tần suất của file gốc.
+
+    Giới hạn: cột phân loại được sinh độc lập với các cột số, nên không có hiệu ứng
+    nhóm - trung bình Stress/Happiness theo nền tảng hay giới tính gần như bằng nhau
+    (chỉ khác do nhiễu), khác với dataset gốc. Dùng để đo hiệu năng, không để phân tích.
+    """
+
+    def __init__(self, reference_path=DATA_PATH, seed=42):
+        reference = pd.read_csv(reference_path)
+        self.columns = list(reference.columns)
+        self.seed = seed
+        self.quantiles = {col: np.sort(reference[col].dropna().to_numpy()) for col in NUMERIC_COLUMNS}
+        self.integer_columns = [col for col in NUMERIC_COLUMNS if pd.api.types.is_integer_dtype(reference[col])]
+
+        # Tương quan trên điểm chuẩn (normal scores) của hạng -> ma trận của copula
+        ranks = reference[NUMERIC_COLUMNS].rank(method="average").to_numpy()
+        scores = stats.norm.ppf(ranks / (len(reference) + 1))
+        corr = np.corrcoef(scores, rowvar=False)
+        # Đảm bảo xác định dương trước khi Cholesky
+        eigval, eigvec = np.linalg.eigh(corr)
+        corr = eigvec @ np.diag(np.clip(eigval, 1e-6, None)) @ eigvec.T
+        self.cholesky = np.linalg.cholesky(corr)
+
+        self.categories = {
+            col: reference[col].value_counts(normalize=True, sort=False) for col in CATEGORY_COLUMNS
+        }
+
+    def _draws(self, block):
+        # Toàn bộ số ngẫu nhiên của một khối BLOCK_ROWS dòng
+        rng = np.random.default_rng([self.seed, block])
+        z = rng.standard_normal((BLOCK_ROWS, len(NUMERIC_COLUMNS))) @ self.cholesky.T
+        categories = {
+            col: rng.choice(freq.index.to_numpy(), size=BLOCK_ROWS, p=freq.to_numpy())
+            for col, freq in self.categories.items()
+        }
+        return stats.norm.cdf(z), categories
+
+    def generate(self, n_rows, start=0):
+        """DataFrame ``n_rows`` dòng, User_ID bắt đầu từ ``start + 1``.
+
+        Số ngẫu nhiên được sinh theo khối cố định căn theo chỉ số dòng tuyệt đối, nên
+        ghép các lần gọi liên tiếp cho kết quả giống nhau bất kể kích thước mỗi lần.
+        """
+        end = start + n_rows
+        u_parts, category_parts = [], {col: [] for col in self.categories}
+        for block in range(start // BLOCK_ROWS, -(-end // BLOCK_ROWS)):
+            lo, hi = max(start - block * BLOCK_ROWS, 0), min(end - block * BLOCK_ROWS, BLOCK_ROWS)
+            u, categories = self._draws(block)
+            u_parts.append(u[lo:hi])
+            for col, values in categories.items():
+                category_parts[col].append(values[lo:hi])
+
+        u = np.concatenate(u_parts) if u_parts else np.empty((0, len(NUMERIC_COLUMNS)))
+        data = {ID_COLUMN: _user_ids(start, n_rows)}
+        for j, col in enumerate(NUMERIC_COLUMNS):
+            values = self.quantiles[col]
+            idx = np.minimum((u[:, j] * len(values)).astype(np.int64), len(values) - 1)
+            data[col] = values[idx]
+        for col, parts in category_parts.items():
+            data[col] = np.concatenate(parts) if parts else np.empty(0, dtype=object)
+        return pd.DataFrame(data)[self.columns]
+
+    def chunks(self, n_rows, chunksize=DEFAULT_CHUNKSIZE):
+        # n_rows = 0 -> một khối rỗng (file CSV chỉ có dòng tiêu đề)
+        for start in range(0, max(n_rows, 1), chunksize):
+            yield self.generate(min(chunksize, n_rows - start), start)
+
+    def write_csv(self, path, n_rows, chunksize=DEFAULT_CHUNKSIZE):
+        """Ghi file CSV theo từng khối (bộ nhớ không phụ thuộc ``n_rows``)."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            for i, chunk in enumerate(self.chunks(n_rows, chunksize)):
+                chunk.to_csv(tmp_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+
+def _user_ids(start, n_rows):
+    # Cùng định dạng với file gốc (U001, U002, ...), tự nới độ rộng khi vượt 999
+    if n_rows == 0:
+        return np.empty(0, dtype=str)
+    ids = np.arange(start + 1, start + n_rows + 1).astype(str)
+    return np.char.add("U", np.char.zfill(ids, 3))
+
+
+def synthetic_csv(n_rows, directory, seed=42, reference_path=DATA_PATH):
+    """Đường dẫn file giả lập ``n_rows`` dòng trong ``directory``, chỉ sinh khi chưa có."""
+    path = os.path.join(directory, f"synthetic-{n_rows}-{seed}-v{GENERATOR_VERSION}.csv")
+    if not os.path.exists(path):
+        SyntheticDataGenerator(reference_path, seed).write_csv(path, n_rows)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sinh dataset giả lập cùng schema với dataset gốc.")
+    parser.add_argument("output", help="File CSV đầu ra")
+    parser.add_argument("--rows", type=float, default=100_000, help="Số dòng (chấp nhận 1e6)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reference", default=DATA_PATH, help="File CSV tham chiếu để ước lượng phân phối")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    n_rows = int(args.rows)
+    if n_rows < 0:
+        parser.error("--rows phải >= 0")
+    SyntheticDataGenerator(args.reference, args.seed).write_csv(args.output, n_rows, args.chunksize)
+    print(f"Đã ghi {n_rows:,} dòng vào {args.output}")
+
+
+if __name__ == "__main__":
+    main()
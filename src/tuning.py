@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from src.model_registry import build_pipeline, data_fingerprint, save_tuned
+
+# Không gian tìm kiếm ngẫu nhiên cho Random Forest (số cây là "tài nguyên" của successive halving)
+PARAM_SPACE = {
+    "max_depth": [None, 6, 10, 16, 24],
+    "min_samples_leaf": [1, 2, 4, 8, 16],
+    "max_features": [1.0, 0.75, 0.5, "sqrt"],
+    "max_samples": [None, 0.5, 0.8],
+}
+MIN_TREES = 25
+MAX_TREES = 400
+ETA = 3
+
+
+def sample_candidates(n_candidates, space=None, random_state=42):
+    """Các bộ tham số ngẫu nhiên, không trùng nhau (tối đa bằng kích thước không gian)."""
+    space = space or PARAM_SPACE
+    rng = np.random.default_rng(random_state)
+    total = int(np.prod([len(v) for v in space.values()]))
+    seen, candidates = set(), []
+    while len(candidates) < min(n_candidates, total):
+        params = {name: values[rng.integers(len(values))] for name, values in space.items()}
+        key = tuple(params.items())
+        if key not in seen:
+            seen.add(key)
+            candidates.append(params)
+    return candidates
+
+
+def halving_schedule(n_candidates, eta=ETA, min_trees=MIN_TREES, max_trees=MAX_TREES):
+    """[(số ứng viên còn lại, số cây)] cho từng vòng: mỗi vòng giữ 1/eta ứng viên, số cây nhân eta."""
+    schedule = [(n_candidates, min(min_trees, max_trees))]
+    while schedule[-1][0] > 1 and schedule[-1][1] < max_trees:
+        alive, trees = schedule[-1]
+        schedule.append((max(1, alive // eta), min(trees * eta, max_trees)))
+    return schedule
+
+
+def _grow(candidate, trees, X_fit, y_fit, X_val, y_val):
+    # warm_start: chỉ huấn luyện thêm (trees - số cây hiện có) cây mới
+    model = candidate["model"]
+    model.set_params(n_estimators=trees)
+    start = time.perf_counter()
+    model.fit(X_fit, y_fit)
+    y_pred = model.predict(X_val)
+    candidate.update({
+        "trees": trees,
+        "r2": r2_score(y_val, y_pred),
+        "rmse": mean_squared_error(y_val, y_pred) ** 0.5,
+        "seconds": candidate.get("seconds", 0.0) + time.perf_counter() - start,
+    })
+
+
+def leaderboard(candidates):
+    """Bảng xếp hạng: ứng viên đi được nhiều vòng hơn xếp trước, rồi theo R² validation."""
+    rows = [{
+        "Ứng viên": c["id"],
+        **{name: "None" if value is None else str(value) for name, value in c["params"].items()},
+        "Số cây": c.get("trees", 0),
+        "Vòng": c.get("round", 0),
+        "R² (validation)": c.get("r2", np.nan),
+        "RMSE": c.get("rmse", np.nan),
+        "Thời gian (s)": c.get("seconds", 0.0),
+        "Còn lại": c.get("alive", True),
+    } for c in candidates]
+    board = pd.DataFrame(rows)
+    return board.sort_values(["Vòng", "R² (validation)"], ascending=False, ignore_index=True)
+
+
+def successive_halving(X, y, n_candidates=16, eta=ETA, min_trees=MIN_TREES, max_trees=MAX_TREES,
+                       validation_size=0.2, n_jobs=-1, random_state=42, callback=None):
+    """Random search + successive halving cho Random Forest, tăng số cây bằng ``warm_start``.
+
+    Vòng đầu mọi ứng viên có ``min_trees`` cây; sau mỗi vòng chỉ giữ 1/``eta`` ứng viên tốt
+    nhất (R² trên tập validation tách từ X, y) và nuôi tiếp forest của chúng lên ``eta`` lần
+    số cây, không fit lại từ đầu. Các ứng viên trong một vòng chạy song song trên thread pool
+    (xây cây trong sklearn nhả GIL), mỗi forest dùng 1 core.
+
+    ``callback(done, total, board)`` được gọi sau mỗi ứng viên với số cây đã xây / tổng số cây
+    của lịch và bảng xếp hạng hiện tại. Trả về (tham số tốt nhất, bảng xếp hạng).
+    """
+    X_fit, X_val, y_fit, y_val = train_test_split(X, y, test_size=validation_size, random_state=random_state)
+    # Chuẩn hóa một lần cho mọi ứng viên (giống bước scaler trong pipeline)
+    scaler = StandardScaler().fit(X_fit)
+    X_fit, X_val = scaler.transform(X_fit), scaler.transform(X_val)
+    y_fit, y_val = np.asarray(y_fit), np.asarray(y_val)
+
+    candidates = [
+        {"id": i, "params": params, "model": RandomForestRegressor(
+            warm_start=True, random_state=random_state, n_jobs=1, **params)}
+        for i, params in enumerate(sample_candidates(n_candidates, random_state=random_state))
+    ]
+    schedule = halving_schedule(len(candidates), eta, min_trees, max_trees)
+    total = sum(alive * trees for alive, trees in schedule)
+    done = 0
+
+    alive = candidates
+    for round_no, (n_alive, trees) in enumerate(schedule):
+        if round_no:
+            alive.sort(key=lambda c: c["r2"], reverse=True)
+            for c in alive[n_alive:]:
+                c["alive"] = False
+            alive = alive[:n_alive]
+        jobs = (delayed(_grow)(c, trees, X_fit, y_fit, X_val, y_val) for c in alive)
+        for c, _ in zip(alive, Parallel(n_jobs=n_jobs, prefer="threads", return_as="generator")(jobs)):
+            c["round"] = round_no
+            done += trees
+            if callback is not None:
+                callback(done, total, leaderboard(candidates))
+
+    best = max(alive, key=lambda c: c["r2"])
+    params = {"random_state": random_state, "n_estimators": best["trees"], **best["params"]}
+    return params, leaderboard(candidates)
+
+
+def tune_random_forest(X_train, y_train, n_candidates=16, eta=ETA, max_trees=MAX_TREES,
+                       n_jobs=-1, callback=None):
+    """Tinh chỉnh, fit lại pipeline thắng trên toàn bộ tập train và lưu vào model registry."""
+    start = time.perf_counter()
+    params, board = successive_halving(X_train, y_train, n_candidates, eta, max_trees=max_trees,
+                                       n_jobs=n_jobs, callback=callback)
+    pipeline = build_pipeline("Random Forest", params, n_jobs=n_jobs).fit(X_train, y_train)
+    info = {
+        "validation_r2": float(board["R² (validation)"].iloc[0]),
+        "seconds": time.perf_counter() - start,
+        "leaderboard": board.to_dict(orient="records"),
+    }
+    save_tuned("Random Forest", data_fingerprint(X_train, y_train), pipeline, params, X_train.columns, info)
+    return pipeline, params, board
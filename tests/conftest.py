@@ -0,0 +1,26 @@
+import pytest
+
+from src import data_loader
+from src.data_loader import normalize_columns, optimize_dtypes
+from src.derived_features import add_derived_features
+from src.synthetic_data import SyntheticDataGenerator
+
+
+@pytest.fixture(scope="session")
+def dataset():
+    # Cùng schema và kiểu dữ liệu với bảng load_data trả về (dataset giả lập 5.000 dòng)
+    raw = SyntheticDataGenerator(seed=7).generate(5000)
+    return add_derived_features(optimize_dtypes(normalize_columns(raw)))
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    # Snapshot, fingerprint và cache trong tiến trình của data_loader nằm trong thư mục tạm
+    directory = tmp_path / "snapshots"
+    monkeypatch.setattr(data_loader, "SNAPSHOT_DIR", str(directory))
+    monkeypatch.setattr(data_loader, "FINGERPRINTS_PATH", str(directory / "fingerprints.json"))
+    monkeypatch.setattr(data_loader, "APPENDS_PATH", str(directory / "appends.json"))
+    monkeypatch.setattr(data_loader, "_frames", {})
+    monkeypatch.setattr(data_loader, "_fingerprints", {})
+    monkeypatch.setattr(data_loader, "_appends", {})
+    return directory
@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import artifacts
+from src.artifacts import BUNDLE_FORMAT, MANIFEST, build_bundle, fetch, load_bundle, write_artifact
+from src.data_loader import dataset_version
+from src.plot_rendering import histogram
+from src.segmentation import UserSegmentation
+from src.synthetic_data import SyntheticDataGenerator
+
+VERSION = "test-version"
+
+
+@pytest.fixture
+def bundle_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "BUNDLE_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(artifacts, "_bundles", {})
+    return tmp_path / "artifacts"
+
+
+def _write_bundle(objects):
+    directory = artifacts.bundle_path(VERSION)
+    os.makedirs(directory)
+    entries = {}
+    for name, obj in objects.items():
+        entries.update(write_artifact(directory, name, obj))
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump({"format": BUNDLE_FORMAT, "artifacts": entries}, f)
+    return entries
+
+
+def _missing():
+    raise AssertionError("artifact phải được đọc từ bundle")
+
+
+def test_round_trip(bundle_dir, dataset):
+    segmentation = UserSegmentation()
+    segmentation.update(dataset)
+    table = dataset.head(50)
+    objects = {
+        "tables": {"all": table, "means": table.mean(numeric_only=True)},
+        "figure": histogram(table, x="Age", title="Age"),
+        "list": [np.arange(5), 1.5, "text"],
+        "segmentation": segmentation,
+    }
+    entries = _write_bundle(objects)
+    assert {entries[name]["format"] for name in ["tables/all", "tables/means", "figure", "segmentation"]} == {
+        "table", "series", "figure", "pickle"}
+
+    tables = fetch(VERSION, "tables", _missing)
+    pd.testing.assert_frame_equal(tables["all"], table)
+    pd.testing.assert_series_equal(tables["means"], table.mean(numeric_only=True), check_names=False)
+    assert fetch(VERSION, "figure", _missing).to_dict() == objects["figure"].to_dict()
+    array, number, text = fetch(VERSION, "list", _missing)
+    assert np.array_equal(array, np.arange(5)) and number == 1.5 and text == "text"
+
+    loaded = fetch(VERSION, "segmentation", _missing)
+    assert np.array_equal(loaded.labels_, segmentation.labels_)
+    assert np.array_equal(loaded.predict(dataset), segmentation.predict(dataset))
+    # Bảng/mô hình dùng chung (như st.cache_resource), figure dựng mới mỗi lần
+    assert fetch(VERSION, "segmentation", _missing) is loaded
+    assert fetch(VERSION, "figure", _missing) is not fetch(VERSION, "figure", _missing)
+
+
+def test_missing_and_unreadable_artifacts_fall_back(bundle_dir, caplog):
+    assert fetch(VERSION, "anything", lambda: "computed") == "computed"
+
+    entries = _write_bundle({"model": np.arange(3)})
+    with open(os.path.join(artifacts.bundle_path(VERSION), entries["model"]["file"]), "wb") as f:
+        f.write(b"not a pickle")
+    with caplog.at_level(logging.WARNING, logger=artifacts.__name__):
+        assert fetch(VERSION, "model", lambda: "computed") == "computed"
+        assert fetch(VERSION, "model", lambda: "again") == "again"
+    assert len(caplog.records) == 1
+    assert fetch(VERSION, "other", lambda: "computed") == "computed"
+
+
+def test_build_bundle(tmp_path, bundle_dir, snapshot_dir):
+    from src.regression_analysis import _page_artifacts
+
+    path = str(tmp_path / "data.csv")
+    SyntheticDataGenerator(seed=9).write_csv(path, 800)
+    directory, manifest = build_bundle(path, workers=1, modules=["src.regression_analysis"])
+
+    version = dataset_version(path)
+    assert directory == artifacts.bundle_path(version) and load_bundle(version) is not None
+    page = fetch(version, "regression/page", _missing)
+    expected = _page_artifacts(path)
+    assert np.allclose(page["model"].params, expected["model"].params)
+    assert page["groups"].keys() == expected["groups"].keys()
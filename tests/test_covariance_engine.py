@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.covariance_engine import CovarianceCube
+from src.streaming_stats import CORR_COLUMNS
+
+AGE_RANGE = (20, 40)
+
+
+@pytest.fixture(scope="module")
+def cube(dataset):
+    return CovarianceCube().update(dataset)
+
+
+def _assert_frame_close(actual, expected):
+    assert list(actual.index) == list(expected.index)
+    assert np.allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_corr_matches_pandas(cube, dataset):
+    _assert_frame_close(cube.corr(CORR_COLUMNS), dataset[CORR_COLUMNS].corr())
+    _assert_frame_close(cube.cov(CORR_COLUMNS), dataset[CORR_COLUMNS].cov())
+
+
+def test_filtered_corr_matches_pandas(cube, dataset):
+    platform = dataset["Social_Media_Platform"].iloc[0]
+    mask = (dataset["Social_Media_Platform"] == platform) & dataset["Age"].between(*AGE_RANGE)
+    filtered = dataset.loc[mask, CORR_COLUMNS]
+
+    assert cube.count(platform=platform, age_range=AGE_RANGE) == len(filtered)
+    _assert_frame_close(cube.corr(CORR_COLUMNS, platform=platform, age_range=AGE_RANGE), filtered.corr())
+
+
+def test_chunked_update_and_merge(cube, dataset):
+    chunked = CovarianceCube()
+    for start in range(0, len(dataset), 1234):
+        chunked.update(dataset.iloc[start:start + 1234])
+    merged = CovarianceCube().update(dataset.iloc[:2000]).merge(CovarianceCube().update(dataset.iloc[2000:]))
+
+    for other in (chunked, merged):
+        _assert_frame_close(other.corr(CORR_COLUMNS), cube.corr(CORR_COLUMNS))
+
+
+def test_rows_with_nan_are_dropped_listwise(dataset):
+    df = dataset.copy()
+    df.loc[df.index[::9], "Sleep_Quality1_10"] = np.nan
+    expected = df.dropna(subset=list(df.select_dtypes("number").columns))[CORR_COLUMNS].corr()
+    _assert_frame_close(CovarianceCube().update(df).corr(CORR_COLUMNS), expected)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.filter_index import FilterIndex
+from src.streaming_stats import PLATFORM_COLUMNS, filter_rows
+
+FILTERS = [(None, None), (None, (20, 40)), ("first", (20, 40)), ("first", (18.5, 25.2)), ("first", (90, 99))]
+
+
+@pytest.fixture(scope="module")
+def index(dataset):
+    return FilterIndex(dataset)
+
+
+def _filters(dataset):
+    platform = dataset["Social_Media_Platform"].iloc[0]
+    return [(platform if p == "first" else p, age_range) for p, age_range in FILTERS]
+
+
+def test_slice_and_count_match_mask(index, dataset):
+    for platform, age_range in _filters(dataset):
+        expected = filter_rows(dataset, age_range, platform)
+        rows = index.slice(platform, age_range)
+        assert index.count(platform, age_range) == len(expected)
+        pd.testing.assert_frame_equal(rows.sort_index(), expected.sort_index())
+
+
+def test_summary_matches_describe(index, dataset):
+    for platform, age_range in _filters(dataset):
+        expected = filter_rows(dataset, age_range, platform)[index.columns].describe().T
+        summary = index.summary(platform, age_range)
+        for column in ["mean", "std", "min", "max"]:
+            assert np.allclose(summary[column], expected[column], equal_nan=True), (platform, age_range, column)
+
+
+def test_gender_counts_and_age_histogram(index, dataset):
+    for platform, age_range in _filters(dataset):
+        filtered = filter_rows(dataset, age_range, platform)
+        expected = filtered["Gender"].astype(str).value_counts()
+        assert index.gender_counts(platform, age_range).sort_index().equals(expected.sort_index())
+
+        hist = index.age_histogram(platform, age_range).set_index(["Age", "Gender"])["count"]
+        grouped = filtered.groupby(["Age", "Gender"], observed=True).size()
+        assert hist.sort_index().to_dict() == {(int(a), str(g)): n for (a, g), n in grouped.items()}
+
+
+def test_group_means_match_groupby(index, dataset):
+    expected = dataset.groupby("Social_Media_Platform", observed=True)[PLATFORM_COLUMNS].mean()
+    means = index.group_means(PLATFORM_COLUMNS).set_index("Social_Media_Platform")
+    assert np.allclose(means.loc[expected.index].to_numpy(), expected.to_numpy())
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.forest_inference import CompiledForest, compile_pipeline
+from src.model_registry import FEATURE_COLUMNS, build_pipeline
+
+
+def _frame(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(5, 2, size=(n_rows, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+
+
+def _fit(X, seed=0):
+    y = X.sum(axis=1).fillna(0) + np.random.default_rng(seed).normal(size=len(X))
+    params = {"random_state": seed, "n_estimators": 25}
+    return build_pipeline("Random Forest", params).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return _fit(_frame(2000, 0))
+
+
+@pytest.fixture(scope="module")
+def forest(pipeline):
+    return CompiledForest.from_pipeline(pipeline)
+
+
+def test_float64_batch(pipeline, forest):
+    X = _frame(3000, 1)
+    assert np.array_equal(forest.predict(X), pipeline.predict(X))
+
+
+def test_float32_batch(pipeline, forest):
+    X = _frame(3000, 2).astype(np.float32)
+    assert np.array_equal(forest.predict(X), pipeline.predict(X))
+
+
+def test_single_row(pipeline, forest):
+    X = _frame(50, 3)
+    for i in range(len(X)):
+        row = X.iloc[[i]]
+        assert np.array_equal(forest.predict(row), pipeline.predict(row))
+
+
+def test_nan_input():
+    X = _frame(2000, 4)
+    X.iloc[::7, 1] = np.nan
+    pipeline = _fit(X, seed=4)
+    forest = CompiledForest.from_pipeline(pipeline)
+    X_new = _frame(1000, 5)
+    X_new.iloc[::3, 1] = np.nan
+    X_new.iloc[::5, 2] = np.nan
+    assert np.array_equal(forest.predict(X_new), pipeline.predict(X_new))
+    assert np.array_equal(forest.predict(X_new.iloc[[0]]), pipeline.predict(X_new.iloc[[0]]))
+
+
+def test_save_load_round_trip(tmp_path, pipeline, forest):
+    path = tmp_path / "forest.npz"
+    forest.save(path)
+    loaded = CompiledForest.load(path)
+    X = _frame(500, 6)
+    assert np.array_equal(loaded.predict(X), pipeline.predict(X))
+    assert list(loaded.feature_names_in_) == FEATURE_COLUMNS
+    assert loaded.max_depth == forest.max_depth
+
+
+def test_non_forest_pipeline_is_not_compiled():
+    X = _frame(200, 7)
+    pipeline = build_pipeline("Linear Regression").fit(X, X.sum(axis=1))
+    assert compile_pipeline(pipeline) is None
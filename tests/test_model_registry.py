@@ -0,0 +1,84 @@
+import os
+from collections import OrderedDict
+
+import pytest
+
+from src import model_registry
+from src.derived_features import DIGITAL_WELLBEING_INDEX
+from src.model_registry import (
+    DEFAULT_PARAMS, FEATURE_COLUMNS, data_fingerprint, get_default_pipeline, pipeline_key, save_tuned,
+    training_split
+)
+from src.synthetic_data import SyntheticDataGenerator
+
+TUNED_PARAMS = {"random_state": 0, "n_estimators": 7, "max_depth": 4}
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch, snapshot_dir):
+    model_dir = tmp_path / "models"
+    monkeypatch.setattr(model_registry, "MODEL_DIR", str(model_dir))
+    monkeypatch.setattr(model_registry, "TUNED_PATH", str(model_dir / "tuned.json"))
+    monkeypatch.setattr(model_registry, "_pipelines", OrderedDict())
+    monkeypatch.setitem(DEFAULT_PARAMS, "Random Forest", {"random_state": 0, "n_estimators": 5})
+    path = str(tmp_path / "data.csv")
+    SyntheticDataGenerator(seed=5).write_csv(path, 600)
+    return path
+
+
+def _tune(path, features, params=TUNED_PARAMS, fingerprint=None):
+    X_train, _, y_train, _ = training_split(model_registry.load_data(path), features)
+    pipeline = model_registry.build_pipeline("Random Forest", params).fit(X_train, y_train)
+    save_tuned("Random Forest", fingerprint or data_fingerprint(X_train, y_train), pipeline, params, features)
+    return pipeline
+
+
+def test_pipeline_key_is_stable(dataset):
+    X, y = dataset[FEATURE_COLUMNS], dataset["Happiness_Index1_10"]
+    fingerprint = data_fingerprint(X, y)
+
+    assert data_fingerprint(X.copy(), y.copy()) == fingerprint
+    assert data_fingerprint(X.reset_index(drop=True), y.reset_index(drop=True)) == fingerprint
+    assert data_fingerprint(X.iloc[:-1], y.iloc[:-1]) != fingerprint
+    assert data_fingerprint(X.rename(columns={FEATURE_COLUMNS[0]: "x"}), y) != fingerprint
+
+    key = pipeline_key("Random Forest", {"n_estimators": 5, "random_state": 0}, fingerprint)
+    assert pipeline_key("Random Forest", {"random_state": 0, "n_estimators": 5}, fingerprint) == key
+    assert pipeline_key("Random Forest", {"random_state": 0, "n_estimators": 6}, fingerprint) != key
+    assert pipeline_key("Linear Regression", {"random_state": 0, "n_estimators": 5}, fingerprint) != key
+
+
+def test_default_pipeline_is_cached(registry):
+    pipeline = get_default_pipeline("Random Forest", registry)
+    assert pipeline.named_steps["model"].n_estimators == 5
+    assert list(pipeline.feature_names_in_) == FEATURE_COLUMNS
+    assert get_default_pipeline("Random Forest", registry) is pipeline
+
+    # Tiến trình mới: nạp từ đĩa, không huấn luyện lại
+    model_registry._pipelines.clear()
+    assert len(os.listdir(model_registry.MODEL_DIR)) == 1
+    assert get_default_pipeline("Random Forest", registry) is not pipeline
+    assert len(os.listdir(model_registry.MODEL_DIR)) == 1
+
+
+def test_tuned_pipeline_is_used(registry):
+    features = FEATURE_COLUMNS[:3]
+    tuned = _tune(registry, features)
+
+    pipeline = get_default_pipeline("Random Forest", registry)
+    assert pipeline is tuned
+    assert pipeline.named_steps["model"].get_params()["max_depth"] == 4
+    assert list(pipeline.feature_names_in_) == features
+
+
+def test_unusable_tuned_pipelines_are_skipped(registry):
+    # Đặc trưng tính từ nhãn -> không chấm điểm được dữ liệu chưa có nhãn
+    _tune(registry, FEATURE_COLUMNS + [DIGITAL_WELLBEING_INDEX.name])
+    assert model_registry.latest_tuned("Random Forest") is None
+    assert list(get_default_pipeline("Random Forest", registry).feature_names_in_) == FEATURE_COLUMNS
+
+    # Tinh chỉnh trên dữ liệu huấn luyện khác -> dùng tham số mặc định
+    _tune(registry, FEATURE_COLUMNS[:3], fingerprint="other-data")
+    pipeline = get_default_pipeline("Random Forest", registry)
+    assert list(pipeline.feature_names_in_) == FEATURE_COLUMNS
+    assert pipeline.named_steps["model"].n_estimators == 5
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import statsmodels.api as sm
+
+from src.ols_engine import GroupedOLSAccumulator, OLSAccumulator, fit_ols
+
+X_COLS = ["Daily_Screen_Timehrs", "Sleep_Quality1_10"]
+Y_COL = "Stress_Level1_10"
+ATTRIBUTES = ["nobs", "df_model", "df_resid", "ssr", "ess", "rsquared", "rsquared_adj",
+              "fvalue", "f_pvalue", "llf", "aic", "bic"]
+SERIES = ["params", "bse", "tvalues", "pvalues"]
+
+
+def _chunks(df, size):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def _statsmodels(df, x_cols=X_COLS, add_constant=True):
+    X = df[x_cols].astype(np.float64)
+    return sm.OLS(df[Y_COL].astype(np.float64), sm.add_constant(X) if add_constant else X, missing="drop").fit()
+
+
+def _assert_same_fit(result, expected):
+    for name in ATTRIBUTES:
+        assert np.isclose(getattr(result, name), getattr(expected, name), rtol=1e-7), name
+    for name in SERIES:
+        assert np.allclose(getattr(result, name).to_numpy(), getattr(expected, name).to_numpy(), rtol=1e-7), name
+    assert np.allclose(result.conf_int().to_numpy(), expected.conf_int().to_numpy(), rtol=1e-7)
+    assert np.allclose(result.cov_params().to_numpy(), expected.cov_params().to_numpy(), rtol=1e-7)
+
+
+@pytest.mark.parametrize("add_constant", [True, False])
+def test_chunked_fit_matches_statsmodels(dataset, add_constant):
+    result = fit_ols(_chunks(dataset, 777), X_COLS, Y_COL, add_constant)
+    _assert_same_fit(result, _statsmodels(dataset, add_constant=add_constant))
+
+
+def test_missing_rows_are_dropped(dataset):
+    df = dataset.copy()
+    df[X_COLS[0]] = df[X_COLS[0]].astype(np.float64)
+    df.loc[df.index[::11], X_COLS[0]] = np.nan
+    head = OLSAccumulator(X_COLS, Y_COL).update(df.iloc[:2000])
+    tail = OLSAccumulator(X_COLS, Y_COL).update(df.iloc[2000:])
+    _assert_same_fit(head.merge(tail).fit(), _statsmodels(df))
+
+
+def test_grouped_fit_matches_statsmodels_per_group(dataset):
+    acc = GroupedOLSAccumulator(X_COLS[:1], Y_COL, "Social_Media_Platform")
+    for chunk in _chunks(dataset, 777):
+        acc.update(chunk)
+    results = acc.fit()
+
+    groups = dataset.groupby("Social_Media_Platform", observed=True)
+    assert set(results) == set(groups.groups)
+    for key, group in groups:
+        _assert_same_fit(results[key], _statsmodels(group, X_COLS[:1]))
+    _assert_same_fit(acc.total().fit(), _statsmodels(dataset, X_COLS[:1]))
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import data_loader
+from src.segmentation import DEFAULT_FEATURES, UserSegmentation
+
+
+def _rows(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.integers(1, 11, size=(n_rows, len(DEFAULT_FEATURES))), columns=DEFAULT_FEATURES)
+
+
+def _write(path, df, mode="w"):
+    df.to_csv(path, mode=mode, header=mode == "w", index=False)
+    # mtime_ns có thể trùng giữa hai lần ghi liên tiếp -> khóa fingerprint phải đổi
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_append_is_detected_from_version(tmp_path, snapshot_dir):
+    path = tmp_path / "data.csv"
+    _write(path, _rows(500, 0))
+    old = data_loader.dataset_version(path)
+    _write(path, _rows(50, 1), mode="a")
+    new = data_loader.dataset_version(path)
+
+    assert data_loader.extends_version(old, new)
+    assert not data_loader.extends_version(new, old)
+    # Tiến trình khác đọc quan hệ nối thêm từ appends.json
+    data_loader._appends.clear()
+    assert data_loader.extends_version(old, new)
+
+
+def test_rewrite_is_not_an_append(tmp_path, snapshot_dir):
+    path = tmp_path / "data.csv"
+    rows = _rows(500, 0)
+    _write(path, rows)
+    old = data_loader.dataset_version(path)
+    rows.iloc[0, 0] += 1
+    _write(path, pd.concat([rows, _rows(50, 1)]))
+
+    assert not data_loader.extends_version(old, data_loader.dataset_version(path))
+
+
+def test_update_partial_fits_appended_rows(tmp_path, snapshot_dir):
+    path = tmp_path / "data.csv"
+    first = _rows(2000, 0)
+    _write(path, first)
+    segmentation = UserSegmentation()
+    labels = segmentation.update(first, data_loader.dataset_version(path))
+    model = segmentation.model
+
+    appended = _rows(300, 1)
+    _write(path, appended, mode="a")
+    both = pd.concat([first, appended], ignore_index=True)
+    updated = segmentation.update(both, data_loader.dataset_version(path))
+
+    assert segmentation.model is model
+    assert len(updated) == len(both)
+    assert np.array_equal(updated[:len(first)], labels)
+
+    # Dữ liệu bị thay thế -> fit lại từ đầu
+    changed = both.copy()
+    changed.iloc[0, 0] += 1
+    _write(path, changed)
+    segmentation.update(changed, data_loader.dataset_version(path))
+    assert segmentation.model is not model
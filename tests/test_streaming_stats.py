@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.streaming_stats import (
+    CORR_COLUMNS, PLATFORM_COLUMNS, RunningStats, compute_eda_tables, distinct_values, filter_rows, read_chunks
+)
+from src.synthetic_data import SyntheticDataGenerator
+
+AGE_RANGE = (20, 40)
+
+
+def _chunks(df, size):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+@pytest.fixture(scope="module")
+def platform(dataset):
+    return dataset["Social_Media_Platform"].iloc[0]
+
+
+def test_summary_matches_describe(dataset, platform):
+    tables = compute_eda_tables(_chunks(dataset, 777), AGE_RANGE, platform)
+    filtered = filter_rows(dataset, AGE_RANGE, platform)
+    expected = filtered.describe().T[["mean", "std", "min", "max"]]
+
+    assert tables["n_filtered"] == len(filtered)
+    assert np.allclose(tables["summary"].loc[expected.index].to_numpy(), expected.to_numpy())
+
+
+def test_group_tables_match_pandas(dataset, platform):
+    tables = compute_eda_tables(_chunks(dataset, 777), AGE_RANGE, platform)
+    filtered = filter_rows(dataset, AGE_RANGE, platform)
+
+    gender = filtered["Gender"].astype(str).value_counts()
+    assert tables["gender_counts"].sort_index().equals(gender.sort_index().astype(np.int64))
+
+    means = dataset.groupby("Social_Media_Platform", observed=True)[PLATFORM_COLUMNS].mean()
+    result = tables["platform_means"].set_index("Social_Media_Platform")
+    means.index = means.index.astype(str)
+    assert np.allclose(result.loc[means.index].to_numpy(), means.to_numpy())
+
+    assert np.allclose(tables["corr"].to_numpy(), dataset[CORR_COLUMNS].corr().to_numpy())
+    assert tables["age_min"] == dataset["Age"].min()
+    assert tables["age_max"] == dataset["Age"].max()
+
+
+def test_running_stats_skips_nan_per_column(dataset):
+    df = dataset[CORR_COLUMNS].astype(np.float64)
+    df.iloc[::5, 0] = np.nan
+    stats = RunningStats()
+    for chunk in _chunks(df, 1000):
+        stats.update(chunk)
+    expected = df.describe().T[["mean", "std", "min", "max"]]
+    assert np.allclose(stats.describe().to_numpy(), expected.to_numpy())
+
+
+def test_read_chunks_matches_whole_file(tmp_path):
+    path = str(tmp_path / "data.csv")
+    SyntheticDataGenerator(seed=3).write_csv(path, 2500)
+    whole = pd.concat(read_chunks(path, chunksize=10_000), ignore_index=True)
+    chunked = pd.concat(read_chunks(path, chunksize=600), ignore_index=True)
+
+    assert len(chunked) == 2500
+    pd.testing.assert_frame_equal(chunked, whole, check_dtype=False)
+    assert distinct_values(path, "Social_Media_Platform", chunksize=600) == sorted(
+        pd.read_csv(path)["Social_Media_Platform"].unique())